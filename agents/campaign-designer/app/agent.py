@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+from collections import OrderedDict
+
 from pydantic import BaseModel, Field
 
 from shared.helpers import (
     call_mcp,
     call_llm,
     call_llm_structured,
+    prompt_json,
     publish_event,
+    turns_as_messages,
     STATE_MCP_URL,
     KNOWLEDGE_MCP_URL,
 )
@@ -24,59 +28,84 @@ from shared.mcp_models import (
 
 logger = logging.getLogger(__name__)
 
+# The character sheet is final before campaign design starts, so each campaign's rendered system
+# prompt is built once per process instead of being re-fetched and re-serialised every question
+SYSTEM_PROMPT_CACHE_SIZE = 64
+
 SYSTEM_TEMPLATE = """You are an expert D&D campaign designer. You have the player's character sheet.
 Ask 3-5 focused questions about genre, tone, themes, and how the character's background
 should drive the story. End your final response with [DONE].
 
 Character: {character_json}"""
 
-PLAN_PARSE_PROMPT = """Based on the conversation, create a complete CampaignPlan JSON. Return ONLY valid JSON:
-{{
-  "title": "string — compelling campaign title",
-  "synopsis": "string — 2-3 sentences covering central conflict, stakes, uniqueness",
-  "acts": ["string", ...],
-  "visual_style": "string — 400-600 chars, detailed visual style guide for image generation",
-  "character_context": "string — how the campaign is balanced around the player character"
-}}
+PLAN_PARSE_PROMPT = """Based on the conversation, create the complete campaign plan.
 Make the visual_style rich: art style, color palette, lighting, atmosphere, level of detail."""
 
 
+_system_prompts: OrderedDict[str, str] = OrderedDict()
+
+
+# call_llm_structured already sends this schema with the parse request, so the field hints live here
+# rather than in a second hand-written copy inside PLAN_PARSE_PROMPT
 class CampaignPlan(BaseModel):
-    title: str = ''
-    synopsis: str = ''
+    title: str = Field('', description='Compelling campaign title')
+    synopsis: str = Field('', description='2-3 sentences covering central conflict, stakes, uniqueness')
     acts: list[str] = Field(default_factory=list)
-    visual_style: str = ''
-    character_context: str = ''
+    visual_style: str = Field('', description='400-600 chars, detailed visual style guide for image generation')
+    character_context: str = Field('', description='How the campaign is balanced around the player character')
 
 
-async def run(campaign_id: str, player_message: str) -> str:
-    # 1. Load context
+async def _get_system_prompt(campaign_id: str) -> str:
+    system = _system_prompts.get(campaign_id)
+    if system is not None:
+        _system_prompts.move_to_end(campaign_id)
+        return system
+
     ctx = await call_mcp(STATE_MCP_URL, 'get_campaign_context', {}, campaign_id, CampaignContextOut)
-    turns_resp = await call_mcp(STATE_MCP_URL, 'get_turns', {'limit': 20}, campaign_id, GetTurnsOut)
+    system = SYSTEM_TEMPLATE.format(character_json=prompt_json(ctx.character.model_dump() if ctx.character else None))
+    # Without a character there is nothing stable to cache yet — fetch again next turn
+    if ctx.character:
+        _system_prompts[campaign_id] = system
+        while len(_system_prompts) > SYSTEM_PROMPT_CACHE_SIZE:
+            _system_prompts.popitem(last=False)
+    return system
+
+
+async def run(campaign_id: str, player_message: str) -> str:
+    # 1. Load context in parallel
+    system, turns_resp = await asyncio.gather(
+        _get_system_prompt(campaign_id),
+        call_mcp(STATE_MCP_URL, 'get_turns', {'limit': 20}, campaign_id, GetTurnsOut),
+    )
 
     # 2. Build messages
-    character_json = json.dumps(ctx.character.model_dump() if ctx.character else {}, indent=2)
-    system = SYSTEM_TEMPLATE.format(character_json=character_json)
     messages: list[dict] = [{'role': 'system', 'content': system}]
-    for t in turns_resp.turns:
-        role = 'assistant' if t.role in ('dm', 'system') else 'user'
-        messages.append({'role': role, 'content': t.content})
+    messages.extend(turns_as_messages(turns_resp.turns))
     if player_message:
         messages.append({'role': 'user', 'content': player_message})
-        await call_mcp(
-            STATE_MCP_URL, 'log_turn', {'role': 'player', 'content': player_message}, campaign_id, LogTurnOut
-        )
 
-    # 3. LLM call
-    llm_resp = await call_llm(messages)
+    # 3. LLM call — the player turn is persisted while the model is generating, not before
+    if player_message:
+        llm_resp, _ = await asyncio.gather(
+            call_llm(messages),
+            call_mcp(
+                STATE_MCP_URL, 'log_turn', {'role': 'player', 'content': player_message}, campaign_id, LogTurnOut
+            ),
+        )
+    else:
+        llm_resp = await call_llm(messages)
     response_text: str = llm_resp['text']
 
-    done = '[DONE]' in response_text
-    clean_text = response_text.replace('[DONE]', '').strip()
+    # One pass over the reply: the marker was present iff removing it shortened the text
+    without_marker = response_text.replace('[DONE]', '')
+    done = len(without_marker) != len(response_text)
+    clean_text = without_marker.strip()
 
     # 4. Log + publish
-    await call_mcp(STATE_MCP_URL, 'log_turn', {'role': 'dm', 'content': clean_text}, campaign_id, LogTurnOut)
-    await publish_event(campaign_id, {'type': 'dm_text', 'content': clean_text})
+    await asyncio.gather(
+        call_mcp(STATE_MCP_URL, 'log_turn', {'role': 'dm', 'content': clean_text}, campaign_id, LogTurnOut),
+        publish_event(campaign_id, {'type': 'dm_text', 'content': clean_text}),
+    )
 
     # 5. If done, parse plan + seed world + transition
     if done:
@@ -85,15 +114,21 @@ async def run(campaign_id: str, player_message: str) -> str:
             {'role': 'user', 'content': PLAN_PARSE_PROMPT},
         ]
         plan = await call_llm_structured(parse_messages, CampaignPlan)
+        plan_json = plan.model_dump()
 
+        # The plan and the switch to play are one write: a failure can't leave a saved plan behind
+        # in a campaign still stuck in design. This turn holds the campaign lock, so no player
+        # message is routed by the new phase before the world is seeded below
         await call_mcp(
             STATE_MCP_URL,
             'save_campaign_plan',
-            {'plan_json': plan.model_dump(), 'visual_style': plan.visual_style},
+            {'plan_json': plan_json, 'visual_style': plan.visual_style, 'phase': 'active'},
             campaign_id,
             OkOut,
         )
 
+        # Seeding (an extraction LLM call) is done before phase_change goes out, so the opening
+        # scene still starts with a seeded world
         try:
             seed_text = plan.synopsis + ' ' + ' '.join(plan.acts)
             await call_mcp(
@@ -101,9 +136,8 @@ async def run(campaign_id: str, player_message: str) -> str:
             )
         except Exception:
             logger.warning('Failed to seed knowledge base during campaign plan finalization', exc_info=True)
-
-        await call_mcp(STATE_MCP_URL, 'set_phase', {'phase': 'active'}, campaign_id, OkOut)
-        await publish_event(campaign_id, {'type': 'campaign_plan_ready', 'plan': plan.model_dump()})
+        _system_prompts.pop(campaign_id, None)
+        await publish_event(campaign_id, {'type': 'campaign_plan_ready', 'plan': plan_json})
         await publish_event(campaign_id, {'type': 'phase_change', 'phase': 'active'})
 
     return clean_text
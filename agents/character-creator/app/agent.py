@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from pydantic import BaseModel, Field
 
@@ -10,6 +11,7 @@ from shared.helpers import (
     call_llm,
     call_llm_structured,
     publish_event,
+    turns_as_messages,
     STATE_MCP_URL,
     MEDIA_MCP_URL,
     DM_VOICE_ID,
@@ -31,106 +33,130 @@ background, class/level, abilities, equipment, limitations, and physical appeara
 When you have enough information for a complete character sheet, end your response with [DONE].
 Keep questions conversational and help the player think through their choices."""
 
-CHARACTER_PARSE_PROMPT = """Based on the conversation, create a complete PlayerCharacter JSON. Return ONLY valid JSON matching this schema exactly:
-{
-  "name": "string",
-  "background": "string — background, origin story, personality",
-  "class_and_level": "string — e.g. 'Level 3 Wizard'",
-  "abilities": ["string", ...],
-  "equipment": ["string", ...],
-  "limitations": ["string", ...],
-  "power_level": "Novice|Apprentice|Journeyman|Expert|Master|Legendary",
-  "visual_description": "string — 300-500 chars, detailed physical appearance for portrait"
-}
+CHARACTER_PARSE_PROMPT = """Based on the conversation, create the complete character sheet.
 Ensure the character has meaningful limitations and a realistic power level."""
 
 
+# call_llm_structured already sends this schema with the parse request, so the field hints live here
+# rather than in a second hand-written copy inside CHARACTER_PARSE_PROMPT
 class PlayerCharacter(BaseModel):
     name: str = ''
-    background: str = ''
-    class_and_level: str = ''
+    background: str = Field('', description='Background, origin story, personality')
+    class_and_level: str = Field('', description="e.g. 'Level 3 Wizard'")
     abilities: list[str] = Field(default_factory=list)
     equipment: list[str] = Field(default_factory=list)
     limitations: list[str] = Field(default_factory=list)
-    power_level: str = 'Novice'
-    visual_description: str = ''
+    power_level: str = Field('Novice', description='Novice|Apprentice|Journeyman|Expert|Master|Legendary')
+    visual_description: str = Field('', description='300-500 chars, detailed physical appearance for portrait')
 
 
 async def run(campaign_id: str, player_message: str) -> str:
-    # 1. Load context
-    ctx = await call_mcp(STATE_MCP_URL, 'get_campaign_context', {}, campaign_id, CampaignContextOut)
+    # 1. Load the interview so far. The campaign context is only needed for the portrait once the
+    #    sheet is done, so it isn't fetched (and serialised by state-mcp) on every interview turn
     turns_resp = await call_mcp(STATE_MCP_URL, 'get_turns', {'limit': 20}, campaign_id, GetTurnsOut)
 
     # 2. Build messages
     messages: list[dict] = [{'role': 'system', 'content': SYSTEM_PROMPT}]
-    for t in turns_resp.turns:
-        role = 'assistant' if t.role in ('dm', 'system') else 'user'
-        messages.append({'role': role, 'content': t.content})
+    messages.extend(turns_as_messages(turns_resp.turns))
     if player_message:
         messages.append({'role': 'user', 'content': player_message})
-        await call_mcp(
-            STATE_MCP_URL, 'log_turn', {'role': 'player', 'content': player_message}, campaign_id, LogTurnOut
-        )
 
-    # 3. LLM call
-    llm_resp = await call_llm(messages)
+    # 3. LLM call — the player turn is persisted while the model is generating, not before
+    if player_message:
+        llm_resp, _ = await asyncio.gather(
+            call_llm(messages),
+            call_mcp(
+                STATE_MCP_URL, 'log_turn', {'role': 'player', 'content': player_message}, campaign_id, LogTurnOut
+            ),
+        )
+    else:
+        llm_resp = await call_llm(messages)
     response_text: str = llm_resp['text']
 
-    done = '[DONE]' in response_text
-    clean_text = response_text.replace('[DONE]', '').strip()
-
-    # 4. Log DM response
-    await call_mcp(STATE_MCP_URL, 'log_turn', {'role': 'dm', 'content': clean_text}, campaign_id, LogTurnOut)
-
-    # 5. Publish text + audio
-    await publish_event(campaign_id, {'type': 'dm_text', 'content': clean_text})
+    # One pass over the reply: the marker was present iff removing it shortened the text
+    without_marker = response_text.replace('[DONE]', '')
+    done = len(without_marker) != len(response_text)
+    clean_text = without_marker.strip()
 
-    try:
-        speak_resp = await call_mcp(
-            MEDIA_MCP_URL,
-            'speak',
-            {'text': clean_text, 'voice_id': DM_VOICE_ID, 'voice_instructions': DM_VOICE_INSTRUCTIONS},
-            campaign_id,
-            SpeakOut,
-        )
-        if speak_resp.stream_path:
-            await publish_event(campaign_id, {'type': 'audio_ready', 'stream_path': speak_resp.stream_path})
-    except Exception:
-        logger.warning('TTS failed during character creation (non-critical)', exc_info=True)
-
-    # 6. If done, parse character + generate portrait + transition
+    # The character sheet is parsed while the final reply is logged, published and voiced below
+    parse_task: asyncio.Future[PlayerCharacter] | None = None
+    ctx_task: asyncio.Future[CampaignContextOut] | None = None
     if done:
+        ctx_task = asyncio.ensure_future(
+            call_mcp(STATE_MCP_URL, 'get_campaign_context', {}, campaign_id, CampaignContextOut)
+        )
         parse_messages = messages + [
             {'role': 'assistant', 'content': response_text},
             {'role': 'user', 'content': CHARACTER_PARSE_PROMPT},
         ]
-        character = await call_llm_structured(parse_messages, PlayerCharacter)
+        parse_task = asyncio.ensure_future(call_llm_structured(parse_messages, PlayerCharacter))
 
-        visual_style = ctx.campaign.visual_style or 'fantasy digital art'
-
-        portrait_path: str | None = None
+    async def _speak() -> str | None:
         try:
-            img_resp = await call_mcp(
+            speak_resp = await call_mcp(
                 MEDIA_MCP_URL,
-                'generate_image',
-                {'prompt': character.visual_description, 'style': visual_style, 'type': 'portrait'},
+                'speak',
+                {'text': clean_text, 'voice_id': DM_VOICE_ID, 'voice_instructions': DM_VOICE_INSTRUCTIONS},
                 campaign_id,
-                ImageOut,
+                SpeakOut,
             )
-            portrait_path = img_resp.file_path or None
+            return speak_resp.stream_path or None
         except Exception:
-            logger.warning('Portrait generation failed during character creation (non-critical)', exc_info=True)
-
-        await call_mcp(
-            STATE_MCP_URL,
-            'save_character',
-            {'character_json': character.model_dump(), 'portrait_path': portrait_path},
-            campaign_id,
-            OkOut,
+            logger.warning('TTS failed during character creation (non-critical)', exc_info=True)
+            return None
+
+    try:
+        # 4. Log DM response, publish the text and request its audio together
+        audio_path, _, _ = await asyncio.gather(
+            _speak(),
+            call_mcp(STATE_MCP_URL, 'log_turn', {'role': 'dm', 'content': clean_text}, campaign_id, LogTurnOut),
+            publish_event(campaign_id, {'type': 'dm_text', 'content': clean_text}),
         )
-        await call_mcp(STATE_MCP_URL, 'set_phase', {'phase': 'campaign_design'}, campaign_id, OkOut)
 
+        # 5. Audio follows the text it voices
+        if audio_path:
+            await publish_event(campaign_id, {'type': 'audio_ready', 'stream_path': audio_path})
+    except BaseException:
+        if parse_task is not None:
+            parse_task.cancel()
+            ctx_task.cancel()
+        raise
+
+    # 6. If done, parse character + generate portrait + transition
+    if parse_task is not None:
+        character, ctx = await asyncio.gather(parse_task, ctx_task)
+        character_json = character.model_dump()
+        visual_style = ctx.campaign.visual_style or 'fantasy digital art'
+
+        async def _portrait() -> str | None:
+            try:
+                img_resp = await call_mcp(
+                    MEDIA_MCP_URL,
+                    'generate_image',
+                    {'prompt': character.visual_description, 'style': visual_style, 'type': 'portrait'},
+                    campaign_id,
+                    ImageOut,
+                )
+                return img_resp.file_path or None
+            except Exception:
+                logger.warning('Portrait generation failed during character creation (non-critical)', exc_info=True)
+                return None
+
+        async def _save_and_advance() -> None:
+            await call_mcp(STATE_MCP_URL, 'save_character', {'character_json': character_json}, campaign_id, OkOut)
+            await call_mcp(STATE_MCP_URL, 'set_phase', {'phase': 'campaign_design'}, campaign_id, OkOut)
+
+        # The sheet is saved and the phase advanced while the portrait renders; the portrait path
+        # is attached afterwards (save_character keeps an existing portrait when given none)
+        portrait_path, _ = await asyncio.gather(_portrait(), _save_and_advance())
         if portrait_path:
+            await call_mcp(
+                STATE_MCP_URL,
+                'save_character',
+                {'character_json': character_json, 'portrait_path': portrait_path},
+                campaign_id,
+                OkOut,
+            )
             await publish_event(campaign_id, {'type': 'portrait_ready', 'file_path': portrait_path})
         await publish_event(campaign_id, {'type': 'phase_change', 'phase': 'campaign_design'})
 
@@ -1,11 +1,17 @@
 from fastapi import FastAPI
 
 from shared.a2a import A2ARequest, A2AResponse, A2AResult, AgentCard
+from shared.helpers import close_http_client
 from .agent import run
 
 app = FastAPI(title='character-creator')
 
 
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    await close_http_client()
+
+
 @app.get('/.well-known/agent.json')
 async def agent_card() -> dict:
     return AgentCard(
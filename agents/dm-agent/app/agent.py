@@ -3,15 +3,23 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-import httpx
-from pydantic import BaseModel
+import re
+from collections import OrderedDict
+from typing import Literal
 
+import orjson
+from pydantic import BaseModel, Field
+
+from shared.a2a import MemoryTaskIn, MemoryTaskOut
 from shared.helpers import (
     call_mcp,
-    call_llm_structured,
+    clip_to_tokens,
+    completed_string_field,
+    get_http_client,
+    prompt_json,
     publish_event,
+    stream_llm_structured,
     STATE_MCP_URL,
     KNOWLEDGE_MCP_URL,
     MEDIA_MCP_URL,
@@ -21,6 +29,7 @@ from shared.helpers import (
 )
 from shared.mcp_models import (
     CampaignContextOut,
+    GetNpcOut,
     GetTurnsOut,
     ImageOut,
     LogTurnOut,
@@ -34,27 +43,31 @@ from shared.mcp_models import (
 
 logger = logging.getLogger(__name__)
 
+_static_prompts: OrderedDict[str, tuple[CampaignContextOut, str]] = OrderedDict()
+# campaign_id -> (style, words of the scene description, image) for the last scene image shown
+_last_scenes: OrderedDict[str, tuple[str, frozenset[str], str]] = OrderedDict()
+
+# Token budgets for the per-turn context block — keeps one verbose turn or a dense
+# world graph from ballooning the prompt
+RECENT_TURNS_TOKENS = 2000
+# Memory is already summary + recent events; these caps keep a long campaign's summary from growing
+# the prompt turn after turn
+LONG_TERM_SUMMARY_TOKENS = 1500
+RECENT_EVENTS_TOKENS = 1000
+RECALLED_CONTEXT_TOKENS = 800
+WORLD_CONTEXT_TOKENS = 800
+
+# Plan and character are fixed once play starts, so each campaign's context and rendered system
+# prompt are fetched and built once per process instead of on every turn
+STATIC_PROMPT_CACHE_SIZE = 64
+
+# The DM rewrites the scene description every turn, even while the player stays in one place. When it shares
+# this fraction of its words with the last scene's, the last image is shown again instead of generating one
+SCENE_REUSE_SIMILARITY = 0.8
+# Campaigns whose last scene image is remembered for that comparison
+SCENE_CACHE_SIZE = 64
+
 DM_SYSTEM = """You are an expert Dungeon Master for a voice-driven D&D campaign.
-Respond with JSON matching this schema exactly:
-{{
-  "gm_speech": "string — narration (2-5 sentences, vivid, immersive)",
-  "scene_description": "string — visual description for image gen (400-800 chars)",
-  "memory_note": "string — one-sentence summary of what changed in the world",
-  "invoke_npc": null | {{
-    "name": "string",
-    "role": "string",
-    "visual_description": "string",
-    "voice_id": "alloy|ash|ballad|coral|echo|fable|onyx|nova|sage|shimmer|verse",
-    "voice_instructions": "string",
-    "briefing": {{
-      "goals": "string",
-      "knows": "string",
-      "mood": "string",
-      "reveal_if": "string"
-    }},
-    "opening_line": "string"
-  }}
-}}
 
 PACING RULES — follow strictly:
 - Set invoke_npc to null for the vast majority of turns. Most turns are exploration: describe the environment, present choices, reveal details, react to player actions.
@@ -63,56 +76,60 @@ PACING RULES — follow strictly:
 - Good DM turns without NPCs: vivid scene descriptions, consequences of player actions, ambient world details, forks in the road, sounds/smells/atmosphere, discovered objects or clues.
 
 Campaign: {campaign_json}
-Character: {character_json}
-Long-term memory: {long_term_summary}
+Character: {character_json}"""
+
+# Per-turn context goes in a separate message after the stable prefix above, so the
+# provider's prompt-prefix cache keeps hitting across turns of the same campaign.
+DM_CONTEXT = """Long-term memory: {long_term_summary}
 Recent events: {recent_events}
 Recalled context: {recalled_context}
 World context: {world_context}
 Recent turns (last 10, NPC excluded): {recent_turns}"""
 
 
+TtsVoice = Literal['alloy', 'ash', 'ballad', 'coral', 'echo', 'fable', 'onyx', 'nova', 'sage', 'shimmer', 'verse']
+
+
+# The output contract lives only here: call_llm_structured sends this schema with every request,
+# so the field hints are descriptions rather than a second hand-written copy in DM_SYSTEM
 class InvokeNpc(BaseModel):
     name: str = ''
     role: str = ''
     visual_description: str = ''
-    voice_id: str = 'ash'
+    voice_id: TtsVoice = Field('ash', description='TTS voice that fits the personality')
     voice_instructions: str = ''
     briefing: NpcBriefing = NpcBriefing()
     opening_line: str = ''
 
 
 class DmResponse(BaseModel):
-    gm_speech: str = ''
-    scene_description: str = ''
-    memory_note: str = ''
+    gm_speech: str = Field('', description='Narration, 2-5 vivid, immersive sentences')
+    scene_description: str = Field('', description='Visual description for image generation (400-800 chars)')
+    memory_note: str = Field('', description='One-sentence summary of what changed in the world')
     invoke_npc: InvokeNpc | None = None
 
 
-class MemoryAgentResult(BaseModel):
-    recalled_context: str = ''
-    long_term_summary: str = ''
-    recent_events: list[str] = []
-
-
-async def _call_memory_agent(campaign_id: str, query: str, new_event: str) -> MemoryAgentResult:
-    payload = json.dumps({'query': query, 'new_event': new_event})
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            MEMORY_AGENT_URL + '/',
-            json={
-                'jsonrpc': '2.0',
-                'method': 'tasks/send',
-                'params': {'task_id': 'mem', 'campaign_id': campaign_id, 'message': payload},
-                'id': 1,
-            },
-        )
-        resp.raise_for_status()
-        result_output = resp.json().get('result', {}).get('output', '{}')
+async def _call_memory_agent(campaign_id: str, query: str, new_event: str) -> MemoryTaskOut:
+    payload = MemoryTaskIn(query=query, new_event=new_event).model_dump_json()
+    request = {
+        'jsonrpc': '2.0',
+        'method': 'tasks/send',
+        'params': {'task_id': 'mem', 'campaign_id': campaign_id, 'message': payload},
+        'id': 1,
+    }
+    resp = await get_http_client().post(
+        MEMORY_AGENT_URL + '/',
+        content=orjson.dumps(request),
+        headers={'Content-Type': 'application/json'},
+        timeout=60,
+    )
+    resp.raise_for_status()
+    result_output = orjson.loads(resp.content).get('result', {}).get('output', '{}')
     try:
-        return MemoryAgentResult.model_validate_json(result_output)
+        return MemoryTaskOut.model_validate_json(result_output)
     except Exception:
         logger.warning('Failed to parse memory agent response')
-        return MemoryAgentResult()
+        return MemoryTaskOut()
 
 
 async def _get_campaign_context(campaign_id: str) -> CampaignContextOut:
@@ -123,6 +140,45 @@ async def _get_campaign_context(campaign_id: str) -> CampaignContextOut:
         return CampaignContextOut()
 
 
+async def _get_static_prompt(campaign_id: str) -> tuple[CampaignContextOut, str]:
+    cached = _static_prompts.get(campaign_id)
+    if cached is not None:
+        _static_prompts.move_to_end(campaign_id)
+        return cached
+
+    ctx = await _get_campaign_context(campaign_id)
+    system = DM_SYSTEM.format(
+        campaign_json=prompt_json(ctx.campaign.model_dump()),
+        character_json=prompt_json(ctx.character.model_dump() if ctx.character else None),
+    )
+    # Only a successfully loaded, in-play campaign is immutable — anything else is re-fetched next turn
+    if getattr(ctx.campaign, 'phase', None) == 'active':
+        _static_prompts[campaign_id] = (ctx, system)
+        while len(_static_prompts) > STATIC_PROMPT_CACHE_SIZE:
+            _static_prompts.popitem(last=False)
+    return ctx, system
+
+
+def _scene_words(description: str) -> frozenset[str]:
+    return frozenset(re.findall(r'[a-z0-9]+', description.lower()))
+
+
+def _reusable_scene(campaign_id: str, style: str, words: frozenset[str]) -> str | None:
+    last = _last_scenes.get(campaign_id)
+    if last is None or last[0] != style or not words:
+        return None
+    _last_scenes.move_to_end(campaign_id)
+    similarity = len(words & last[1]) / len(words | last[1])
+    return last[2] if similarity >= SCENE_REUSE_SIMILARITY else None
+
+
+def _remember_scene(campaign_id: str, style: str, words: frozenset[str], file_path: str) -> None:
+    _last_scenes[campaign_id] = (style, words, file_path)
+    _last_scenes.move_to_end(campaign_id)
+    while len(_last_scenes) > SCENE_CACHE_SIZE:
+        _last_scenes.popitem(last=False)
+
+
 async def _get_turns(campaign_id: str) -> GetTurnsOut:
     try:
         return await call_mcp(
@@ -145,101 +201,155 @@ async def _get_world_context(campaign_id: str, focus_text: str) -> WorldContextO
 
 async def run(campaign_id: str, player_message: str) -> str:
     # 1. Gather all context in parallel
-    ctx, turns_resp, world_resp, mem = await asyncio.gather(
-        _get_campaign_context(campaign_id),
+    (ctx, system), turns_resp, world_resp, mem = await asyncio.gather(
+        _get_static_prompt(campaign_id),
         _get_turns(campaign_id),
         _get_world_context(campaign_id, player_message),
         _call_memory_agent(campaign_id, player_message, ''),
     )
 
     campaign = ctx.campaign
-    character = ctx.character
     turns = turns_resp.turns
     world_context = world_resp.context
     long_term_summary = mem.long_term_summary
     recalled_context = mem.recalled_context
     recent_events = mem.recent_events
 
-    # 2. LLM call — player turn is logged only after this succeeds, so a retry
-    #    of a failed turn is safe (no duplicate player turns in history).
-    recent_turns_text = '\n'.join(f'[{t.role.upper()}] {t.content}' for t in turns)
-    system = DM_SYSTEM.format(
-        campaign_json=json.dumps(campaign.model_dump(), indent=2),
-        character_json=json.dumps(character.model_dump() if character else {}, indent=2),
-        long_term_summary=long_term_summary or 'None yet.',
-        recent_events='\n'.join(f'- {e}' for e in recent_events) or 'None yet.',
-        recalled_context=recalled_context or 'None.',
-        world_context=world_context or 'No world data yet.',
-        recent_turns=recent_turns_text or 'None.',
+    # 2. LLM call — player turn is logged only after this succeeds, so a retry of a failed turn is safe
+    #    (no duplicate player turns in history). Narration already shown from the stream is retracted (step 3)
+    recent_turns_text = clip_to_tokens(
+        '\n'.join(f'[{t.role.upper()}] {t.content}' for t in turns), RECENT_TURNS_TOKENS, keep='tail'
     )
-    dm = await call_llm_structured(
-        [{'role': 'system', 'content': system}, {'role': 'user', 'content': player_message}],
-        DmResponse,
-        timeout=90,
-    )
-
-    visual_style: str = campaign.visual_style or 'fantasy digital art, detailed'
-
-    # 3. Log player turn then DM turn (system-tagged messages logged as system)
-    is_system_trigger = player_message.startswith('[SYSTEM]')
-    log_role = 'system' if is_system_trigger else 'player'
-    await call_mcp(STATE_MCP_URL, 'log_turn', {'role': log_role, 'content': player_message}, campaign_id, LogTurnOut)
-    # Store the full DmResponse as intent so background tasks can be reconstructed
-    # if the process crashes before they complete.
-    await call_mcp(
-        STATE_MCP_URL,
-        'log_turn',
-        {'role': 'dm', 'content': dm.gm_speech, 'metadata': {'intent': dm.model_dump()}},
-        campaign_id,
-        LogTurnOut,
+    context = DM_CONTEXT.format(
+        long_term_summary=clip_to_tokens(long_term_summary, LONG_TERM_SUMMARY_TOKENS) or 'None yet.',
+        recent_events=clip_to_tokens('\n'.join(f'- {e}' for e in recent_events), RECENT_EVENTS_TOKENS, keep='tail')
+        or 'None yet.',
+        recalled_context=clip_to_tokens(recalled_context, RECALLED_CONTEXT_TOKENS) or 'None.',
+        world_context=clip_to_tokens(world_context, WORLD_CONTEXT_TOKENS) or 'No world data yet.',
+        recent_turns=recent_turns_text or 'None.',
     )
-
-    # 4. Publish dm_text — frontend unlocks input immediately
-    await publish_event(campaign_id, {'type': 'dm_text', 'content': dm.gm_speech})
-
-    # 5. TTS + image + memory + world — awaited so the Redis lock is held until
-    #    all side effects complete and errors propagate rather than being dropped.
-    async def _speak() -> None:
-        try:
-            r = await call_mcp(
+    messages = [
+        {'role': 'system', 'content': system},
+        {'role': 'system', 'content': context},
+        {'role': 'user', 'content': player_message},
+    ]
+
+    # 3. Narration first — gm_speech leads the response schema, so as soon as it is complete in the stream
+    #    the player gets the text and its audio, while the model is still writing the scene description,
+    #    memory note and NPC. An answer that arrives in one piece (a cache hit) is announced after parsing.
+    #    If the rest of the response then fails, nothing has been logged, so the narration and its audio are
+    #    retracted before the error goes out and the retried turn starts from a clean transcript.
+    #    Scene media is held back until dm_text is out, keeping the event order unchanged
+    dm_published = asyncio.Event()
+
+    async def _announce(speech: str) -> str | None:
+        """Publish the narration and then its audio; returns the audio's stream path once published."""
+        speak = asyncio.ensure_future(
+            call_mcp(
                 MEDIA_MCP_URL,
                 'speak',
-                {'text': dm.gm_speech, 'voice_id': DM_VOICE_ID, 'voice_instructions': DM_VOICE_INSTRUCTIONS},
+                {'text': speech, 'voice_id': DM_VOICE_ID, 'voice_instructions': DM_VOICE_INSTRUCTIONS},
                 campaign_id,
                 SpeakOut,
                 timeout=90,
             )
+        )
+        try:
+            await publish_event(campaign_id, {'type': 'dm_text', 'content': speech})
+        except BaseException:
+            speak.cancel()
+            raise
+        finally:
+            dm_published.set()
+        try:
+            r = await speak
             if r.stream_path:
                 await publish_event(campaign_id, {'type': 'audio_ready', 'stream_path': r.stream_path})
+                return r.stream_path
         except Exception:
             logger.warning('DM TTS failed (non-critical)', exc_info=True)
+        return None
 
-    async def _image() -> None:
+    async def _retract(announced: asyncio.Future[str | None], speech: str) -> None:
+        announced.cancel()
+        (stream_path,) = await asyncio.gather(announced, return_exceptions=True)
         try:
-            r = await call_mcp(
-                MEDIA_MCP_URL,
-                'generate_image',
-                {'prompt': dm.scene_description, 'style': visual_style, 'type': 'scene'},
+            await publish_event(
                 campaign_id,
-                ImageOut,
-                timeout=120,
+                {
+                    'type': 'dm_text_retracted',
+                    'content': speech,
+                    'stream_path': stream_path if isinstance(stream_path, str) else None,
+                },
             )
-            if r.file_path:
-                # Persist so page reloads show the latest scene image
-                await call_mcp(
-                    STATE_MCP_URL,
-                    'log_turn',
-                    {'role': 'system', 'content': '', 'image_path': r.file_path},
+        except Exception:
+            logger.warning('Failed to retract streamed DM narration', exc_info=True)
+
+    announce: asyncio.Future[str | None] | None = None
+    parts: list[str] = []
+    try:
+        async for delta in stream_llm_structured(messages, DmResponse, timeout=90):
+            parts.append(delta)
+            if announce is None and '"' in delta:
+                speech = completed_string_field(''.join(parts), 'gm_speech')
+                if speech is not None:
+                    announce = asyncio.ensure_future(_announce(speech))
+        dm = DmResponse.model_validate_json(''.join(parts))
+    except Exception:
+        if announce is not None:
+            await _retract(announce, speech)
+        raise
+    except BaseException:
+        if announce is not None:
+            announce.cancel()
+        raise
+    if announce is None:
+        announce = asyncio.ensure_future(_announce(dm.gm_speech))
+
+    visual_style: str = campaign.visual_style or 'fantasy digital art, detailed'
+
+    # 4. Image + memory + world — started as soon as the DM response exists, so the slow generation
+    #    calls overlap the state writes below
+
+    async def _image() -> None:
+        try:
+            # A scene that has barely changed shows its last image again. It is still logged and published,
+            # since an NPC portrait may have replaced it on screen in the meantime
+            words = _scene_words(dm.scene_description)
+            file_path = _reusable_scene(campaign_id, visual_style, words)
+            if file_path is None:
+                r = await call_mcp(
+                    MEDIA_MCP_URL,
+                    'generate_image',
+                    {'prompt': dm.scene_description, 'style': visual_style, 'type': 'scene'},
                     campaign_id,
-                    LogTurnOut,
+                    ImageOut,
+                    timeout=120,
+                )
+                file_path = r.file_path
+                if file_path:
+                    _remember_scene(campaign_id, visual_style, words, file_path)
+            await dm_published.wait()
+            if file_path:
+                # The image is on disk, so the player sees it right away; persisting it (so page
+                # reloads show the latest scene image) happens alongside rather than first
+                await asyncio.gather(
+                    call_mcp(
+                        STATE_MCP_URL,
+                        'log_turn',
+                        {'role': 'system', 'content': '', 'image_path': file_path},
+                        campaign_id,
+                        LogTurnOut,
+                    ),
+                    publish_event(campaign_id, {'type': 'scene_ready', 'file_path': file_path}),
                 )
-                await publish_event(campaign_id, {'type': 'scene_ready', 'file_path': r.file_path})
         except Exception:
             logger.warning('Scene image generation failed (non-critical)', exc_info=True)
 
     async def _memory_and_world() -> None:
         try:
-            await _call_memory_agent(campaign_id, player_message, dm.memory_note)
+            # Write-only: recall for this turn already happened in step 1
+            await _call_memory_agent(campaign_id, '', dm.memory_note)
         except Exception:
             logger.warning('Memory agent update failed (non-critical)', exc_info=True)
         try:
@@ -249,78 +359,132 @@ async def run(campaign_id: str, player_message: str) -> str:
         except Exception:
             logger.warning('World update after DM turn failed (non-critical)', exc_info=True)
 
-    await asyncio.gather(_speak(), _image(), _memory_and_world())
-
+    # The player-facing media and the bookkeeping are gathered separately: an introduced NPC follows the
+    # scene's speech and image, but doesn't wait on memory consolidation and world extraction (both LLM calls)
+    media = asyncio.gather(announce, _image())
+    bookkeeping = asyncio.ensure_future(_memory_and_world())
+    side_effects = asyncio.gather(media, bookkeeping)
+    # An introduced NPC's portrait and opening line are generated now, alongside the scene media,
+    # instead of only once the scene image has finished
+    npc_portrait: asyncio.Future[ImageOut] | None = None
+    npc_audio: asyncio.Future[SpeakOut] | None = None
     if dm.invoke_npc:
-        await _handle_npc(campaign_id, dm.invoke_npc, visual_style)
+        npc_portrait = asyncio.ensure_future(_npc_portrait(campaign_id, dm.invoke_npc, visual_style))
+        npc_audio = asyncio.ensure_future(_npc_opening_audio(campaign_id, dm.invoke_npc))
+    try:
+        # 5. Log player turn then DM turn (system-tagged messages logged as system)
+        is_system_trigger = player_message.startswith('[SYSTEM]')
+        log_role = 'system' if is_system_trigger else 'player'
+        await call_mcp(
+            STATE_MCP_URL, 'log_turn', {'role': log_role, 'content': player_message}, campaign_id, LogTurnOut
+        )
+        # Store the full DmResponse as intent so background tasks can be reconstructed
+        # if the process crashes before they complete.
+        await call_mcp(
+            STATE_MCP_URL,
+            'log_turn',
+            {'role': 'dm', 'content': dm.gm_speech, 'metadata': {'intent': dm.model_dump()}},
+            campaign_id,
+            LogTurnOut,
+        )
+    except BaseException:
+        side_effects.cancel()
+        if dm.invoke_npc:
+            npc_portrait.cancel()
+            npc_audio.cancel()
+        raise
+
+    # 6. Awaited so the Redis lock is held until all side effects complete
+    try:
+        await media
+        if dm.invoke_npc:
+            await _handle_npc(campaign_id, dm.invoke_npc, npc_portrait, await npc_audio)
+    except BaseException:
+        # As in step 5: the NPC's media must not outlive the turn and its lock
+        if dm.invoke_npc:
+            npc_portrait.cancel()
+            npc_audio.cancel()
+        raise
+    finally:
+        await side_effects
 
     return dm.gm_speech
 
 
-async def _handle_npc(campaign_id: str, invoke_npc: InvokeNpc, visual_style: str) -> None:
-    save_resp = await call_mcp(
-        STATE_MCP_URL, 'save_npc', {'npc_json': invoke_npc.model_dump()}, campaign_id, SaveNpcOut
-    )
-    npc_id: str = save_resp.npc_id
-
-    async def _npc_portrait() -> ImageOut:
-        try:
-            return await call_mcp(
-                MEDIA_MCP_URL,
-                'generate_image',
-                {'prompt': invoke_npc.visual_description, 'style': visual_style, 'type': 'portrait'},
-                campaign_id,
-                ImageOut,
-                timeout=120,
-            )
-        except Exception:
-            logger.warning('NPC portrait generation failed (non-critical)', exc_info=True)
-            return ImageOut()
+async def _npc_portrait(campaign_id: str, invoke_npc: InvokeNpc, visual_style: str) -> ImageOut:
+    try:
+        # A returning NPC keeps the portrait it was first shown with; the model rewords the visual
+        # description on every introduction, which would otherwise miss the image cache
+        existing = await call_mcp(STATE_MCP_URL, 'get_npc', {'name': invoke_npc.name}, campaign_id, GetNpcOut)
+        if existing.npc and existing.npc.portrait_path:
+            return ImageOut(file_path=existing.npc.portrait_path)
+        return await call_mcp(
+            MEDIA_MCP_URL,
+            'generate_image',
+            {'prompt': invoke_npc.visual_description, 'style': visual_style, 'type': 'portrait'},
+            campaign_id,
+            ImageOut,
+            timeout=120,
+        )
+    except Exception:
+        logger.warning('NPC portrait generation failed (non-critical)', exc_info=True)
+        return ImageOut()
 
-    async def _npc_opening_audio() -> SpeakOut:
-        try:
-            return await call_mcp(
-                MEDIA_MCP_URL,
-                'speak',
-                {
-                    'text': invoke_npc.opening_line,
-                    'voice_id': invoke_npc.voice_id,
-                    'voice_instructions': invoke_npc.voice_instructions,
-                },
-                campaign_id,
-                SpeakOut,
-                timeout=90,
-            )
-        except Exception:
-            logger.warning('NPC opening audio failed (non-critical)', exc_info=True)
-            return SpeakOut()
 
-    portrait_resp, npc_audio_resp = await asyncio.gather(_npc_portrait(), _npc_opening_audio())
-    portrait_path: str | None = portrait_resp.file_path
+async def _npc_opening_audio(campaign_id: str, invoke_npc: InvokeNpc) -> SpeakOut:
+    try:
+        return await call_mcp(
+            MEDIA_MCP_URL,
+            'speak',
+            {
+                'text': invoke_npc.opening_line,
+                'voice_id': invoke_npc.voice_id,
+                'voice_instructions': invoke_npc.voice_instructions,
+            },
+            campaign_id,
+            SpeakOut,
+            timeout=90,
+        )
+    except Exception:
+        logger.warning('NPC opening audio failed (non-critical)', exc_info=True)
+        return SpeakOut()
+
+
+async def _handle_npc(
+    campaign_id: str, invoke_npc: InvokeNpc, portrait: asyncio.Future[ImageOut], npc_audio_resp: SpeakOut
+) -> None:
+    npc_json = invoke_npc.model_dump()
+    # A returning NPC's portrait, or a new one that finished before the scene, is introduced with the NPC.
+    # A new portrait still generating doesn't hold the introduction back — the player reads and hears the
+    # opening line meanwhile, and the portrait follows below
+    portrait_pending = not portrait.done()
+    portrait_path: str | None = None if portrait_pending else portrait.result().file_path
     opening_audio_path: str | None = npc_audio_resp.stream_path
 
-    if portrait_path:
-        await call_mcp(
+    # The NPC row and its opening turn are written in parallel — the two writes are independent until
+    # set_active_npc needs both ids
+    save_resp, log_resp = await asyncio.gather(
+        call_mcp(
             STATE_MCP_URL,
             'save_npc',
-            {'npc_json': invoke_npc.model_dump(), 'portrait_path': portrait_path},
+            {'npc_json': npc_json, 'portrait_path': portrait_path},
             campaign_id,
             SaveNpcOut,
-        )
-
-    log_resp = await call_mcp(
-        STATE_MCP_URL,
-        'log_turn',
-        {
-            'role': 'npc',
-            'content': invoke_npc.opening_line,
-            'npc_name': invoke_npc.name,
-            'audio_path': opening_audio_path,
-            'image_path': portrait_path,
-        },
-        campaign_id,
-        LogTurnOut,
+        ),
+        call_mcp(
+            STATE_MCP_URL,
+            'log_turn',
+            {
+                'role': 'npc',
+                'content': invoke_npc.opening_line,
+                'npc_name': invoke_npc.name,
+                'audio_path': opening_audio_path,
+            },
+            campaign_id,
+            LogTurnOut,
+        ),
     )
+    npc_id: str = save_resp.npc_id
     conv_start_turn_id: str = log_resp.turn_id
 
     await call_mcp(
@@ -328,7 +492,7 @@ async def _handle_npc(campaign_id: str, invoke_npc: InvokeNpc, visual_style: str
         'set_active_npc',
         {
             'npc_id': npc_id,
-            'briefing': invoke_npc.briefing.model_dump(),
+            'briefing': npc_json['briefing'],
             'conv_start_turn_id': conv_start_turn_id,
         },
         campaign_id,
@@ -353,3 +517,39 @@ async def _handle_npc(campaign_id: str, invoke_npc: InvokeNpc, visual_style: str
     )
     if opening_audio_path:
         await publish_event(campaign_id, {'type': 'audio_ready', 'stream_path': opening_audio_path})
+
+    # The portrait is logged as its own system image turn, like a scene image, so a reload shows it whichever
+    # way it arrived — a late one can't be attached to the opening turn, which is already written by then
+    if portrait_pending:
+        portrait_path = (await portrait).file_path
+        if portrait_path:
+            # Also saved onto the NPC row (the upsert keeps everything else), and introduced again so the
+            # player's view picks it up
+            await asyncio.gather(
+                call_mcp(
+                    STATE_MCP_URL,
+                    'save_npc',
+                    {'npc_json': npc_json, 'portrait_path': portrait_path},
+                    campaign_id,
+                    SaveNpcOut,
+                ),
+                call_mcp(
+                    STATE_MCP_URL,
+                    'log_turn',
+                    {'role': 'system', 'content': '', 'image_path': portrait_path},
+                    campaign_id,
+                    LogTurnOut,
+                ),
+                publish_event(
+                    campaign_id,
+                    {'type': 'npc_introduced', 'npc_name': invoke_npc.name, 'portrait_path': portrait_path},
+                ),
+            )
+    elif portrait_path:
+        await call_mcp(
+            STATE_MCP_URL,
+            'log_turn',
+            {'role': 'system', 'content': '', 'image_path': portrait_path},
+            campaign_id,
+            LogTurnOut,
+        )
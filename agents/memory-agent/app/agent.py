@@ -2,19 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import uuid
+from collections import OrderedDict
 
 from pydantic import BaseModel
 
+from shared.a2a import MemoryTaskOut
 from shared.helpers import call_mcp, call_llm_structured, STATE_MCP_URL, MEMORY_MCP_URL
 from shared.mcp_models import GetMemoryOut, OkOut, RecallOut
 
 STM_THRESHOLD = 5
+# Hard cap: once short-term memory grows this long, compress without asking for a cutoff
+STM_MAX = 15
+# Most recent events kept verbatim after a compression
+STM_KEEP = 3
+# Below this much short-term text a compression saves too little prompt to be worth asking for a cutoff
+STM_MIN_CHARS = 1500
+# Size cap alongside STM_MAX: a few long events can outgrow the prompt budget well before the count does
+STM_MAX_CHARS = 6000
+# Long-term memory is sent with every DM turn, so each compression keeps it to a fixed size instead of
+# letting it grow with the campaign
+LONG_TERM_MAX_WORDS = 1000
+# Long-term memory only changes on a compression, but is read on every DM turn; the last version seen per
+# campaign is kept here and state-mcp leaves the text out of its reply while that version is current
+LONG_TERM_CACHE_SIZE = 128
 
 logger = logging.getLogger(__name__)
 
-CUTOFF_SYSTEM = """Analyze the following recent D&D session events and determine if this is a good cutoff point for compressing memory.
+_long_terms: OrderedDict[str, tuple[str, str]] = OrderedDict()  # campaign_id -> (version, long_term)
+
+CUTOFF_SYSTEM = """Analyze the following recent D&D session events and determine if this is a good cutoff point
+for compressing memory.
 
 Consider these factors:
 - Have the players moved to a significantly different location/context?
@@ -23,11 +43,13 @@ Consider these factors:
 - Have they left NPCs/locations they likely won't return to soon?
 - Is there a natural narrative break?
 
-A good cutoff point means the recent events form a cohesive "session" that can be summarized without losing important context.
+A good cutoff point means the recent events form a cohesive "session" that can be summarized without losing
+important context.
 
 Respond with JSON: {"reason": "...", "should_compress": true|false}"""
 
-COMPRESSION_SYSTEM = """You are helping manage memory for a D&D campaign. Compress the short-term memory into the long-term memory.
+COMPRESSION_SYSTEM = """You are helping manage memory for a D&D campaign. Compress the short-term memory into the
+long-term memory.
 
 Your task:
 1. Update the long-term memory by integrating the short-term events
@@ -42,8 +64,26 @@ Your task:
    - ## Story Progression
 4. Remove redundant information and organize by importance
 5. Keep the most recent/relevant information accessible
+6. Keep the long-term memory under {max_words} words — condense older, resolved material rather than letting it grow
+
+Respond with JSON: {{"compressed_long_term": "...", "session_summary": "..."}}""".format(max_words=LONG_TERM_MAX_WORDS)
+
 
-Respond with JSON: {"compressed_long_term": "...", "session_summary": "..."}"""
+async def _get_memory(campaign_id: str, include_long_term: bool) -> GetMemoryOut:
+    body: dict = {'include_long_term': include_long_term}
+    cached = _long_terms.get(campaign_id) if include_long_term else None
+    if cached is not None:
+        body['long_term_version'] = cached[0]
+    mem = await call_mcp(STATE_MCP_URL, 'get_memory', body, campaign_id, GetMemoryOut)
+    if include_long_term:
+        if cached is not None and mem.long_term_version == cached[0]:
+            mem.long_term = cached[1]
+            _long_terms.move_to_end(campaign_id)
+        else:
+            _long_terms[campaign_id] = (mem.long_term_version, mem.long_term)
+            while len(_long_terms) > LONG_TERM_CACHE_SIZE:
+                _long_terms.popitem(last=False)
+    return mem
 
 
 class MemoryCutoffDecision(BaseModel):
@@ -56,38 +96,66 @@ class MemoryCompression(BaseModel):
     session_summary: str = ''
 
 
-async def run(campaign_id: str, query: str, new_event: str) -> dict:
-    """Returns {recalled_context, long_term_summary, recent_events}."""
+async def run(campaign_id: str, query: str, new_event: str) -> MemoryTaskOut:
+    async def _store() -> None:
+        await call_mcp(
+            MEMORY_MCP_URL,
+            'store',
+            {'turn_id': str(uuid.uuid4()), 'text': new_event, 'role': 'dm'},
+            campaign_id,
+            OkOut,
+        )
+
+    async def _recall() -> str:
+        resp = await call_mcp(MEMORY_MCP_URL, 'recall', {'query': query, 'top_k': 8}, campaign_id, RecallOut)
+        return resp.context
+
+    async def _noop() -> None:
+        return None
 
-    # 1. Load current memory state
-    mem = await call_mcp(STATE_MCP_URL, 'get_memory', {}, campaign_id, GetMemoryOut)
+    # 1-3. Load memory state, embed + store the new event, and run semantic recall in parallel.
+    #      Recall is skipped for write-only calls (empty query) so the query isn't embedded
+    #      and searched a second time just to be discarded.
+    mem, _, recalled = await asyncio.gather(
+        _get_memory(campaign_id, include_long_term=bool(query)),
+        _store() if new_event else _noop(),
+        _recall() if query else _noop(),
+    )
     short_term: list[str] = list(mem.short_term)
     long_term: str = mem.long_term
-
-    # 2. Store new event if provided
+    recalled_context: str = recalled or ''
     if new_event:
-        turn_id = str(uuid.uuid4())
-        await call_mcp(
-            MEMORY_MCP_URL, 'store', {'turn_id': turn_id, 'text': new_event, 'role': 'dm'}, campaign_id, OkOut
-        )
         short_term.append(new_event)
 
-    # 3. Semantic recall
-    recall_result = await call_mcp(MEMORY_MCP_URL, 'recall', {'query': query, 'top_k': 8}, campaign_id, RecallOut)
-    recalled_context: str = recall_result.context
-
-    # 4. Check if we should compress
-    if len(short_term) >= STM_THRESHOLD:
-        recent_events_text = '\n'.join(short_term)
+    # 4. Check if we should compress. Only a call that appended an event can change the answer, so read-only
+    #    calls skip this. Once there is enough text to be worth folding, the LLM picks a narrative cutoff; at
+    #    STM_MAX events or STM_MAX_CHARS of text we compress unconditionally, keeping the buffer bounded in both
+    #    count and size.
+    compressed = False
+    folded = 0
+    if new_event and len(short_term) >= STM_THRESHOLD:
         try:
-            decision = await call_llm_structured(
-                [
-                    {'role': 'system', 'content': CUTOFF_SYSTEM},
-                    {'role': 'user', 'content': f'RECENT EVENTS:\n{recent_events_text}'},
-                ],
-                MemoryCutoffDecision,
-            )
-            if decision.should_compress:
+            stm_chars = sum(len(e) for e in short_term)
+            should_compress = len(short_term) >= STM_MAX or stm_chars >= STM_MAX_CHARS
+            if not should_compress and stm_chars >= STM_MIN_CHARS:
+                # The event text is only assembled when the cutoff question is actually asked
+                recent_events_text = '\n'.join(short_term)
+                decision = await call_llm_structured(
+                    [
+                        {'role': 'system', 'content': CUTOFF_SYSTEM},
+                        {'role': 'user', 'content': f'RECENT EVENTS:\n{recent_events_text}'},
+                    ],
+                    MemoryCutoffDecision,
+                )
+                should_compress = decision.should_compress
+            if should_compress:
+                if not query:
+                    # Write-only calls skip long-term memory on the read; only a compression needs it
+                    full = await _get_memory(campaign_id, include_long_term=True)
+                    long_term = full.long_term
+                # Fold only the events that leave short-term memory; the kept tail stays verbatim
+                # and is folded in a later round, so no event is summarised into long-term twice.
+                fold_text = '\n'.join(short_term[:-STM_KEEP])
                 compression = await call_llm_structured(
                     [
                         {'role': 'system', 'content': COMPRESSION_SYSTEM},
@@ -95,24 +163,35 @@ async def run(campaign_id: str, query: str, new_event: str) -> dict:
                             'role': 'user',
                             'content': (
                                 f'CURRENT LONG-TERM MEMORY:\n{long_term}\n\n'
-                                f'SHORT-TERM MEMORY TO COMPRESS:\n{recent_events_text}'
+                                f'SHORT-TERM MEMORY TO COMPRESS:\n{fold_text}'
                             ),
                         },
                     ],
                     MemoryCompression,
                 )
                 long_term = compression.compressed_long_term or long_term
-                short_term = short_term[-3:]  # keep last 3 events
+                folded = len(short_term) - STM_KEEP
+                del short_term[:-STM_KEEP]
+                compressed = True
         except Exception:
             logger.warning('Memory compression failed (non-critical)', exc_info=True)
 
-    # 5. Persist updated memory
-    await call_mcp(
-        STATE_MCP_URL, 'update_memory', {'short_term': short_term, 'long_term': long_term}, campaign_id, OkOut
-    )
+    # 5. Persist — every event is appended in place, so the per-turn write stays one small row
+    #    update however long the memory grows. A compression only rewrites long-term memory and
+    #    drops the folded head of the log, so events appended meanwhile by another turn survive.
+    writes = []
+    if new_event:
+        writes.append(call_mcp(STATE_MCP_URL, 'append_memory', {'event': new_event}, campaign_id, OkOut))
+    if compressed:
+        writes.append(
+            call_mcp(
+                STATE_MCP_URL,
+                'compress_memory',
+                {'long_term': long_term, 'folded': folded},
+                campaign_id,
+                OkOut,
+            )
+        )
+    await asyncio.gather(*writes)
 
-    return {
-        'recalled_context': recalled_context,
-        'long_term_summary': long_term,
-        'recent_events': short_term,
-    }
+    return MemoryTaskOut(recalled_context=recalled_context, long_term_summary=long_term, recent_events=short_term)
@@ -1,11 +1,18 @@
-import json
-
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 
-from shared.a2a import A2ARequest, A2AResponse, A2AResult, AgentCard
+from shared.a2a import A2ARequest, A2AResponse, A2AResult, AgentCard, MemoryTaskIn
+from shared.helpers import close_http_client
 from .agent import run
 
-app = FastAPI(title='memory-agent')
+# Replies carry the whole long-term memory (twice JSON-encoded inside the A2A envelope)
+app = FastAPI(title='memory-agent', default_response_class=ORJSONResponse)
+
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    await close_http_client()
 
 
 @app.get('/.well-known/agent.json')
@@ -19,10 +26,8 @@ async def agent_card() -> dict:
 @app.post('/')
 async def handle(req: A2ARequest) -> A2AResponse:
     try:
-        payload = json.loads(req.params.message)
-    except json.JSONDecodeError:
-        payload = {}
-    query: str = payload.get('query', '')
-    new_event: str = payload.get('new_event', '')
-    result = await run(req.params.campaign_id, query, new_event)
-    return A2AResponse(result=A2AResult(output=json.dumps(result)), id=req.id)
+        task = MemoryTaskIn.model_validate_json(req.params.message)
+    except ValidationError:
+        task = MemoryTaskIn()
+    result = await run(req.params.campaign_id, task.query, task.new_event)
+    return A2AResponse(result=A2AResult(output=result.model_dump_json()), id=req.id)
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from pydantic import BaseModel
+from collections import OrderedDict
+
+from pydantic import BaseModel, Field
 
 from shared.helpers import (
     call_mcp,
     call_llm_structured,
+    clip_to_tokens,
     publish_event,
     STATE_MCP_URL,
     KNOWLEDGE_MCP_URL,
@@ -19,6 +23,7 @@ from shared.mcp_models import (
     GetNpcOut,
     LogTurnOut,
     NpcBriefing,
+    NpcData,
     OkOut,
     SpeakOut,
     UpdateWorldOut,
@@ -26,8 +31,16 @@ from shared.mcp_models import (
 
 logger = logging.getLogger(__name__)
 
+# Budget for the conversation transcript in the NPC prompt; oldest lines are dropped first
+CONV_TURNS_TOKENS = 3000
+# Conversations whose NPC record and rendered system prompt are kept in-process
+STATIC_PROMPT_CACHE_SIZE = 64
+
 NPC_SYSTEM = """You are {npc_name} in a live D&D session. Stay in character at all times.
 
+Never set done=true mid-conversation. End only when the conversation genuinely feels over
+(goodbye said, topic fully resolved, or continuing would feel forced).
+
 STATIC PROFILE:
   Role: {npc_role}
   Voice/personality: {voice_instructions}
@@ -36,30 +49,31 @@ BRIEFING FOR THIS CONVERSATION:
   Goals:      {goals}
   You know:   {knows}
   Your mood:  {mood}
-  Reveal if:  {reveal_if}
+  Reveal if:  {reveal_if}"""
 
-CONTEXT (what led to this conversation):
+# Everything above is fixed for the whole conversation; the transcript grows each turn,
+# so it follows as its own message to keep the prefix cacheable.
+NPC_CONTEXT = """CONTEXT (what led to this conversation):
 {preamble_turns}
 
 CONVERSATION SO FAR:
-{conv_turns}
-
-Respond with JSON:
-{{
-  "npc_speech": "string — your next line, in character, natural dialogue length",
-  "done": boolean
-}}
-
-Never set done=true mid-conversation. End only when the conversation genuinely feels over
-(goodbye said, topic fully resolved, or continuing would feel forced)."""
+{conv_turns}"""
 
 SUMMARY_SYSTEM = """Summarise this NPC conversation in 1-2 sentences from the DM's perspective,
 noting only what the player learned or agreed to. Be concise.
-Return JSON: {{"summary": "string"}}"""
+Return JSON: {"summary": "string"}"""
+
+
+# (npc_id, conv_start_turn_id) -> (NPC record, rendered NPC_SYSTEM); profile and briefing are
+# fixed for the length of one conversation, so neither is re-fetched nor re-formatted per line
+_static_prompts: OrderedDict[tuple[str, str], tuple[NpcData, str]] = OrderedDict()
+
+# Transcript line prefixes, built once; every other role reads as the DM
+_TURN_PREFIX = {'player': '[Player] ', 'npc': '[You] '}
 
 
 class NpcTurnResponse(BaseModel):
-    npc_speech: str = ''
+    npc_speech: str = Field('', description='Your next line, in character, natural dialogue length')
     done: bool = False
 
 
@@ -68,52 +82,22 @@ class NpcConversationSummary(BaseModel):
 
 
 def _format_turn(role: str, content: str) -> str:
-    if role == 'player':
-        return f'[Player] {content}'
-    elif role == 'npc':
-        return f'[You] {content}'
-    else:
-        return f'[DM] {content}'
+    return _TURN_PREFIX.get(role, '[DM] ') + content
 
 
-async def run(campaign_id: str, player_message: str) -> str:
-    # 1. Get active NPC state
-    npc_state = await call_mcp(STATE_MCP_URL, 'get_active_npc_state', {}, campaign_id, ActiveNpcStateOut)
-    if not npc_state.npc_id:
-        return ''
+async def _get_static_prompt(campaign_id: str, npc_state: ActiveNpcStateOut) -> tuple[NpcData, str] | None:
+    key = (npc_state.npc_id, npc_state.conv_start_turn_id or '')
+    cached = _static_prompts.get(key)
+    if cached is not None:
+        _static_prompts.move_to_end(key)
+        return cached
 
-    briefing: NpcBriefing = npc_state.briefing or NpcBriefing()
-    conv_start_turn_id = npc_state.conv_start_turn_id
-
-    # 2. Get NPC record
     npc_resp = await call_mcp(STATE_MCP_URL, 'get_npc', {'npc_id': npc_state.npc_id}, campaign_id, GetNpcOut)
     npc = npc_resp.npc
-
     if not npc:
-        return ''
-
-    # 3. Preamble: 3 turns before conversation started
-    preamble_turns: list = []
-    if conv_start_turn_id:
-        pre_resp = await call_mcp(
-            STATE_MCP_URL, 'get_turns', {'before_turn_id': conv_start_turn_id, 'limit': 3}, campaign_id, GetTurnsOut
-        )
-        preamble_turns = pre_resp.turns
-
-    # 4. Conversation turns since start
-    conv_turns: list = []
-    if conv_start_turn_id:
-        conv_resp = await call_mcp(
-            STATE_MCP_URL, 'get_turns', {'since_turn_id': conv_start_turn_id}, campaign_id, GetTurnsOut
-        )
-        conv_turns = conv_resp.turns
+        return None
 
-    preamble_text = '\n'.join(_format_turn(t.role, t.content) for t in preamble_turns) or '(start of session)'
-    conv_text = '\n'.join(_format_turn(t.role, t.content) for t in conv_turns)
-    if player_message:
-        conv_text += f'\n[Player] {player_message}'
-
-    # 5. Build system prompt + LLM call
+    briefing: NpcBriefing = npc_state.briefing or NpcBriefing()
     system = NPC_SYSTEM.format(
         npc_name=npc.name or 'Unknown',
         npc_role=npc.role,
@@ -122,35 +106,93 @@ async def run(campaign_id: str, player_message: str) -> str:
         knows=briefing.knows,
         mood=briefing.mood,
         reveal_if=briefing.reveal_if,
+    )
+    _static_prompts[key] = (npc, system)
+    while len(_static_prompts) > STATIC_PROMPT_CACHE_SIZE:
+        _static_prompts.popitem(last=False)
+    return npc, system
+
+
+async def run(campaign_id: str, player_message: str) -> str:
+    # 1. Get active NPC state
+    npc_state = await call_mcp(STATE_MCP_URL, 'get_active_npc_state', {}, campaign_id, ActiveNpcStateOut)
+    if not npc_state.npc_id:
+        return ''
+
+    conv_start_turn_id = npc_state.conv_start_turn_id
+
+    async def _turns(body: dict) -> list:
+        if not conv_start_turn_id:
+            return []
+        return (await call_mcp(STATE_MCP_URL, 'get_turns', body, campaign_id, GetTurnsOut)).turns
+
+    # 2-4. NPC record + system prompt (once per conversation), the 3-turn preamble before the
+    #      conversation started, and the conversation so far — all keyed on the NPC state alone,
+    #      so they are fetched together
+    static, preamble_turns, conv_turns = await asyncio.gather(
+        _get_static_prompt(campaign_id, npc_state),
+        _turns({'before_turn_id': conv_start_turn_id, 'limit': 3}),
+        _turns({'since_turn_id': conv_start_turn_id}),
+    )
+    if static is None:
+        return ''
+    npc, system = static
+
+    preamble_text = '\n'.join(_format_turn(t.role, t.content) for t in preamble_turns) or '(start of session)'
+    conv_text = '\n'.join(_format_turn(t.role, t.content) for t in conv_turns)
+
+    # 5. LLM call
+    context = NPC_CONTEXT.format(
         preamble_turns=preamble_text,
-        conv_turns=conv_text,
+        conv_turns=clip_to_tokens(conv_text, CONV_TURNS_TOKENS, keep='tail') or '(none yet)',
     )
     npc_turn = await call_llm_structured(
-        [{'role': 'system', 'content': system}, {'role': 'user', 'content': player_message}],
+        [
+            {'role': 'system', 'content': system},
+            {'role': 'system', 'content': context},
+            {'role': 'user', 'content': player_message},
+        ],
         NpcTurnResponse,
     )
 
-    # 6. Generate audio
-    audio_path: str | None = None
-    try:
-        speak_resp = await call_mcp(
-            MEDIA_MCP_URL,
-            'speak',
+    # 6. Publish the line, voice it and log the player turn together — the player reads the reply
+    #    while it is synthesised. The campaign lock is held until run() returns, so the next
+    #    message still sees both turns logged.
+    async def _speak() -> str | None:
+        try:
+            speak_resp = await call_mcp(
+                MEDIA_MCP_URL,
+                'speak',
+                {
+                    'text': npc_turn.npc_speech,
+                    'voice_id': npc.voice_id,
+                    'voice_instructions': npc.voice_instructions,
+                },
+                campaign_id,
+                SpeakOut,
+                timeout=90,
+            )
+            return speak_resp.stream_path or None
+        except Exception:
+            logger.warning('TTS failed for NPC speech (non-critical)', exc_info=True)
+            return None
+
+    audio_path, _, _ = await asyncio.gather(
+        _speak(),
+        call_mcp(STATE_MCP_URL, 'log_turn', {'role': 'player', 'content': player_message}, campaign_id, LogTurnOut),
+        publish_event(
+            campaign_id,
             {
-                'text': npc_turn.npc_speech,
-                'voice_id': npc.voice_id,
-                'voice_instructions': npc.voice_instructions,
+                'type': 'npc_speech',
+                'npc_name': npc.name,
+                'content': npc_turn.npc_speech,
             },
-            campaign_id,
-            SpeakOut,
-            timeout=90,
-        )
-        audio_path = speak_resp.stream_path or None
-    except Exception:
-        logger.warning('TTS failed for NPC speech (non-critical)', exc_info=True)
+        ),
+    )
+    if audio_path:
+        await publish_event(campaign_id, {'type': 'audio_ready', 'stream_path': audio_path})
 
-    # 7. Log player + NPC turns
-    await call_mcp(STATE_MCP_URL, 'log_turn', {'role': 'player', 'content': player_message}, campaign_id, LogTurnOut)
+    # 7. Log NPC turn
     await call_mcp(
         STATE_MCP_URL,
         'log_turn',
@@ -165,56 +207,58 @@ async def run(campaign_id: str, player_message: str) -> str:
         LogTurnOut,
     )
 
-    # 8. Publish events
-    await publish_event(
-        campaign_id,
-        {
-            'type': 'npc_speech',
-            'npc_name': npc.name,
-            'content': npc_turn.npc_speech,
-        },
-    )
-    if audio_path:
-        await publish_event(campaign_id, {'type': 'audio_ready', 'stream_path': audio_path})
-
-    # 9. If done, summarise and clear
+    # 8. If done, summarise and clear
     if npc_turn.done:
-        conv_transcript = '\n'.join(_format_turn(t.role, t.content) for t in conv_turns)
-        conv_transcript += f'\n{_format_turn("player", player_message)}'
-        conv_transcript += f'\n{_format_turn("npc", npc_turn.npc_speech)}'
-        summary_text: str
-        try:
-            summary = await call_llm_structured(
-                [
-                    {'role': 'system', 'content': SUMMARY_SYSTEM},
-                    {'role': 'user', 'content': f'Conversation with {npc.name}:\n\n{conv_transcript}'},
-                ],
-                NpcConversationSummary,
-            )
-            summary_text = summary.summary
-        except Exception:
-            logger.warning('NPC conversation summary failed', exc_info=True)
-            summary_text = f'Conversation with {npc.name} concluded.'
-
-        await call_mcp(
-            STATE_MCP_URL,
-            'log_turn',
-            {
-                'role': 'system',
-                'content': summary_text,
-                'metadata': {'type': 'npc_conv_summary', 'npc_name': npc.name},
-            },
-            campaign_id,
-            LogTurnOut,
+        # Extends the transcript already built for the prompt rather than re-formatting every turn
+        conv_transcript = '\n'.join(
+            (conv_text, _format_turn('player', player_message), _format_turn('npc', npc_turn.npc_speech))
         )
-        await call_mcp(STATE_MCP_URL, 'clear_active_npc', {}, campaign_id, OkOut)
 
+        async def _summarise() -> str:
+            try:
+                summary = await call_llm_structured(
+                    [
+                        {'role': 'system', 'content': SUMMARY_SYSTEM},
+                        {'role': 'user', 'content': f'Conversation with {npc.name}:\n\n{conv_transcript}'},
+                    ],
+                    NpcConversationSummary,
+                )
+                return summary.summary
+            except Exception:
+                logger.warning('NPC conversation summary failed', exc_info=True)
+                return f'Conversation with {npc.name} concluded.'
+
+        async def _update_world() -> None:
+            try:
+                await call_mcp(
+                    KNOWLEDGE_MCP_URL, 'update_world', {'narrative_text': conv_transcript}, campaign_id, UpdateWorldOut
+                )
+            except Exception:
+                logger.warning('World update after NPC conversation failed (non-critical)', exc_info=True)
+
+        # World extraction only needs the transcript, so its LLM call runs alongside the summary's
+        # instead of after it; it still finishes before the DM picks the scene back up
+        world_update = asyncio.ensure_future(_update_world())
         try:
-            await call_mcp(
-                KNOWLEDGE_MCP_URL, 'update_world', {'narrative_text': conv_transcript}, campaign_id, UpdateWorldOut
+            summary_text = await _summarise()
+            await asyncio.gather(
+                call_mcp(
+                    STATE_MCP_URL,
+                    'log_turn',
+                    {
+                        'role': 'system',
+                        'content': summary_text,
+                        'metadata': {'type': 'npc_conv_summary', 'npc_name': npc.name},
+                    },
+                    campaign_id,
+                    LogTurnOut,
+                ),
+                call_mcp(STATE_MCP_URL, 'clear_active_npc', {}, campaign_id, OkOut),
             )
-        except Exception:
-            logger.warning('World update after NPC conversation failed (non-critical)', exc_info=True)
+        except BaseException:
+            world_update.cancel()
+            raise
+        await world_update
 
         await publish_event(
             campaign_id,
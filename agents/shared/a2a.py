@@ -35,3 +35,17 @@ class A2AResponse(BaseModel):
     jsonrpc: str = '2.0'
     result: A2AResult
     id: Optional[Any] = None
+
+
+# ─── Memory agent payloads (JSON-encoded in A2ATaskParams.message / A2AResult.output) ───
+
+
+class MemoryTaskIn(BaseModel):
+    query: str = ''
+    new_event: str = ''
+
+
+class MemoryTaskOut(BaseModel):
+    recalled_context: str = ''
+    long_term_summary: str = ''
+    recent_events: list[str] = []
@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import logging
 import os
-from typing import TypeVar, Type
+from typing import AsyncIterator, TypeVar, Type
 
 import httpx
+import orjson
 import redis.asyncio as aioredis
 from pydantic import BaseModel
 
+from shared.mcp_models import Turn
+
 LLM_SERVICE_URL = os.environ.get('LLM_SERVICE_URL', 'http://llm-service:9001')
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
 
@@ -27,11 +30,19 @@ DM_VOICE_INSTRUCTIONS: str = (
     'Speak in a deep, authoritative voice with dramatic pauses and varied intonation to bring the fantasy world to life'
 )
 
+# Bookkeeping fields dropped from JSON shown to the LLM: ids, file paths, the setup phase and
+# the image-only style guide (which also appears twice — on the campaign row and in the plan)
+PROMPT_EXCLUDED_KEYS = frozenset({'id', 'phase', 'portrait_path', 'visual_style'})
+
+# Rough chars-per-token for English prose across the Gemini / OpenAI / Anthropic tokenizers
+CHARS_PER_TOKEN = 4
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T', bound=BaseModel)
 
 _redis: aioredis.Redis | None = None
+_http: httpx.AsyncClient | None = None
 
 
 def get_redis() -> aioredis.Redis:
@@ -41,17 +52,35 @@ def get_redis() -> aioredis.Redis:
     return _redis
 
 
+def get_http_client() -> httpx.AsyncClient:
+    # One pooled client per agent process: MCP, LLM and A2A calls reuse keep-alive connections
+    # instead of paying connection setup on every hop. Timeouts are passed per request.
+    global _http
+    if _http is None:
+        _http = httpx.AsyncClient(limits=httpx.Limits(max_connections=64, max_keepalive_connections=16))
+    return _http
+
+
+async def close_http_client() -> None:
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+
 async def call_mcp(
     base_url: str, tool: str, body: dict, campaign_id: str, response_model: Type[T], timeout: float = 60.0
 ) -> T:
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.post(
-            f'{base_url}/tools/{tool}',
-            json=body,
-            headers={'X-Campaign-ID': campaign_id},
-        )
-        resp.raise_for_status()
-        return response_model.model_validate(resp.json())
+    resp = await get_http_client().post(
+        f'{base_url}/tools/{tool}',
+        json=body,
+        headers={'X-Campaign-ID': campaign_id},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    # Validated straight from the response bytes by the model's compiled core validator — one
+    # pass, without first building an intermediate dict tree
+    return response_model.model_validate_json(resp.content)
 
 
 async def call_llm(
@@ -63,10 +92,21 @@ async def call_llm(
     payload: dict = {'messages': messages, 'response_format': response_format}
     if response_json_schema is not None:
         payload['response_json_schema'] = response_json_schema
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.post(f'{LLM_SERVICE_URL}/generate', json=payload)
-        resp.raise_for_status()
-        return resp.json()
+    # Prompts carry the whole campaign state and transcript; orjson encodes straight to bytes
+    resp = await get_http_client().post(
+        f'{LLM_SERVICE_URL}/generate',
+        content=orjson.dumps(payload),
+        headers={'Content-Type': 'application/json'},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_for(response_model: Type[BaseModel]) -> dict:
+    """Build each response model's JSON schema once; model_json_schema() re-walks every field per call."""
+    return response_model.model_json_schema()
 
 
 async def call_llm_structured(
@@ -75,10 +115,85 @@ async def call_llm_structured(
     timeout: float = 60.0,
 ) -> T:
     """Call LLM with the Pydantic model's JSON schema for constrained generation, then validate."""
-    schema = response_model.model_json_schema()
+    schema = _schema_for(response_model)
     resp = await call_llm(messages, response_format='json', response_json_schema=schema, timeout=timeout)
     return response_model.model_validate_json(resp['text'])
 
 
+async def stream_llm_structured(
+    messages: list[dict],
+    response_model: Type[BaseModel],
+    timeout: float = 60.0,
+) -> AsyncIterator[str]:
+    """Like call_llm_structured, but yields the raw JSON text as it is generated; the caller validates the whole."""
+    payload = {'messages': messages, 'response_format': 'json', 'response_json_schema': _schema_for(response_model)}
+    async with get_http_client().stream(
+        'POST',
+        f'{LLM_SERVICE_URL}/generate/stream',
+        content=orjson.dumps(payload),
+        headers={'Content-Type': 'application/json'},
+        timeout=timeout,
+    ) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.aiter_text():
+            yield chunk
+
+
+def completed_string_field(partial_json: str, field: str) -> str | None:
+    """Decode a string field of a JSON object that is still being generated, once its closing quote has arrived."""
+    key = partial_json.find(f'"{field}"')
+    if key < 0:
+        return None
+    colon = partial_json.find(':', key + len(field) + 2)
+    start = partial_json.find('"', colon + 1) if colon >= 0 else -1
+    if start < 0 or partial_json[colon + 1 : start].strip():
+        return None
+    end = start + 1
+    while (end := partial_json.find('"', end)) >= 0:
+        # A quote behind an odd number of backslashes is part of the string
+        text = partial_json[start + 1 : end]
+        backslashes = len(text) - len(text.rstrip('\\'))
+        if backslashes % 2 == 0:
+            return orjson.loads(partial_json[start : end + 1])
+        end += 1
+    return None
+
+
+def turns_as_messages(turns: list[Turn]) -> list[dict]:
+    """Map logged turns onto chat messages — DM/system lines are the assistant, everything else the user."""
+    return [
+        {'role': 'assistant' if t.role in ('dm', 'system') else 'user', 'content': t.content} for t in turns
+    ]
+
+
+def prompt_json(data: dict | None) -> str:
+    """Serialise state for a prompt: sorted keys so the bytes are stable turn to turn, no bookkeeping fields."""
+
+    def _strip(value):
+        if isinstance(value, dict):
+            return {k: _strip(v) for k, v in value.items() if k not in PROMPT_EXCLUDED_KEYS}
+        return value
+
+    # orjson writes UTF-8 as-is (like ensure_ascii=False) and sorts/indents in one native pass
+    return orjson.dumps(_strip(data or {}), option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode()
+
+
+def clip_to_tokens(text: str, max_tokens: int, keep: str = 'head') -> str:
+    """Trim text to roughly max_tokens, cutting on a line boundary.
+
+    keep='tail' drops the oldest lines instead of the newest (for chronological logs).
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    if keep == 'tail':
+        clipped = text[-limit:]
+        newline = clipped.find('\n')
+        return clipped[newline + 1 :] if newline != -1 else clipped
+    clipped = text[:limit]
+    newline = clipped.rfind('\n')
+    return clipped[:newline] if newline != -1 else clipped
+
+
 async def publish_event(campaign_id: str, event: dict) -> None:
-    await get_redis().publish(f'sse:campaign:{campaign_id}', json.dumps(event))
+    await get_redis().publish(f'sse:campaign:{campaign_id}', orjson.dumps(event))
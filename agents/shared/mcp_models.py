@@ -77,6 +77,7 @@ class ActiveNpcStateOut(BaseModel):
 class GetMemoryOut(BaseModel):
     short_term: list[str] = Field(default_factory=list)
     long_term: str = ''
+    long_term_version: str = ''
 
 
 # ─── Memory MCP ───────────────────────────────────────────────────
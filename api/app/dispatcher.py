@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+
 import httpx
 from pydantic import BaseModel
 
@@ -58,11 +60,12 @@ def _opening_prompt(ctx: CampaignContext) -> str:
 
 async def dispatch(campaign_id: str, message: str) -> None:
     """Dispatch message to correct agent. Called as asyncio.create_task from the game router."""
-    routing = await _get_routing_state(campaign_id)
-
     if message == OPENING_SCENE_SENTINEL:
-        ctx = await _get_campaign_context(campaign_id)
+        # The opening scene needs both lookups; fetch them together rather than back to back
+        routing, ctx = await asyncio.gather(_get_routing_state(campaign_id), _get_campaign_context(campaign_id))
         message = _opening_prompt(ctx)
+    else:
+        routing = await _get_routing_state(campaign_id)
 
     if routing.phase == 'character_creation':
         await send_task(settings.character_creator_url, campaign_id, message)
@@ -1,9 +1,12 @@
 import asyncio
-import json
+import os
+import shutil
 import uuid
 from pathlib import Path
+from typing import BinaryIO
 
 import httpx
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import text
@@ -19,6 +22,12 @@ from .schemas import PlayerMessage, AudioUploadResponse
 router = APIRouter(tags=['game'])
 
 LOCK_TTL = 180  # seconds — must exceed LLM timeout (90s) + image gen (120s)
+MEDIA_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+_IMMUTABLE_MEDIA_DIRS = ('images/', 'audio/')
+
+# Turns dispatched in the background. The event loop only keeps weak references to tasks, so they are
+# held here until done — which also lets shutdown wait for them instead of dropping them mid-turn
+_turn_tasks: set[asyncio.Task] = set()
 
 
 async def _assert_campaign_owner(campaign_id: str, user_id: str, db: AsyncSession) -> None:
@@ -30,6 +39,12 @@ async def _assert_campaign_owner(campaign_id: str, user_id: str, db: AsyncSessio
         raise HTTPException(status_code=403, detail='Access denied')
 
 
+def _save_upload(src: BinaryIO, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with dest.open('wb') as out:
+        shutil.copyfileobj(src, out)
+
+
 @router.post('/campaigns/{campaign_id}/audio', response_model=AudioUploadResponse)
 async def upload_audio(
     campaign_id: str,
@@ -42,8 +57,9 @@ async def upload_audio(
     ext = Path(file.filename or 'recording.webm').suffix or '.webm'
     filename = f'uploads/{uuid.uuid4().hex}{ext}'
     dest = Path(settings.media_root) / filename
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_bytes(await file.read())
+    # Copy the spooled upload straight to disk in a worker thread instead of reading the
+    # whole recording into memory and writing it from the event loop
+    await asyncio.to_thread(_save_upload, file.file, dest)
 
     async with httpx.AsyncClient(timeout=120) as client:
         resp = await client.post(
@@ -78,15 +94,23 @@ async def send_message(
         except Exception as exc:
             await redis.publish(
                 f'sse:campaign:{campaign_id}',
-                json.dumps({'type': 'error', 'message': str(exc), 'code': 'AGENT_ERROR'}),
+                orjson.dumps({'type': 'error', 'message': str(exc), 'code': 'AGENT_ERROR'}),
             )
         finally:
             await redis.delete(lock_key)
 
-    asyncio.create_task(_run_and_release())
+    task = asyncio.create_task(_run_and_release())
+    _turn_tasks.add(task)
+    task.add_done_callback(_turn_tasks.discard)
     return {'ok': True}
 
 
+async def wait_for_turns(timeout: float) -> None:
+    """Let running turns finish and release their campaign locks, rather than leaving them held for LOCK_TTL."""
+    if _turn_tasks:
+        await asyncio.wait(_turn_tasks, timeout=timeout)
+
+
 @router.get('/campaigns/{campaign_id}/stream')
 async def stream(
     campaign_id: str,
@@ -95,6 +119,9 @@ async def stream(
     db: AsyncSession = Depends(get_db),
 ) -> StreamingResponse:
     await _assert_campaign_owner(campaign_id, user['user_id'], db)
+    # The stream stays open for the whole session; hand the ownership check's connection back to the
+    # pool now rather than holding one idle per connected player until they leave
+    await db.close()
     redis = get_redis()
 
     async def event_generator():
@@ -158,7 +185,9 @@ async def stream_audio_proxy(
         async with httpx.AsyncClient(timeout=90) as client:
             async with client.stream('GET', f'{settings.media_mcp_url}/audio/stream/{cache_key}') as resp:
                 resp.raise_for_status()
-                async for chunk in resp.aiter_bytes(4096):
+                # Forward chunks as tts-service produces them — re-buffering to a fixed size
+                # would hold back the first audible samples
+                async for chunk in resp.aiter_bytes():
                     yield chunk
 
     return StreamingResponse(_proxy(), media_type='audio/wav')
@@ -170,6 +199,12 @@ async def serve_media(
     user: dict = Depends(get_current_user),
 ) -> FileResponse:
     full_path = Path(settings.media_root) / file_path
-    if not full_path.exists():
+    try:
+        stat_result = await asyncio.to_thread(os.stat, full_path)
+    except OSError:
         raise HTTPException(status_code=404, detail='File not found')
-    return FileResponse(str(full_path))
+    # Generated images and audio are named by a hash of what produced them, so a path never changes content
+    # and the browser can keep it for good. FileResponse derives the ETag from the stat result and sends the
+    # body with sendfile
+    headers = {'Cache-Control': MEDIA_CACHE_CONTROL} if file_path.startswith(_IMMUTABLE_MEDIA_DIRS) else None
+    return FileResponse(str(full_path), headers=headers, stat_result=stat_result)
@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from .auth.router import router as auth_router
 from .campaigns.router import router as campaigns_router
-from .game.router import router as game_router
+from .game.router import router as game_router, wait_for_turns
 
 app = FastAPI(title='llm-dnd-api', version='1.0.0')
 
@@ -12,6 +12,11 @@ app.include_router(campaigns_router, prefix=PREFIX)
 app.include_router(game_router, prefix=PREFIX)
 
 
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    await wait_for_turns(timeout=30)
+
+
 @app.get('/health')
 async def health():
     return {'ok': True}
@@ -60,7 +60,7 @@ export const api = {
   game: {
     uploadAudio: (campaignId: string, blob: Blob) => {
       const fd = new FormData()
-      fd.append('file', blob, 'recording.webm')
+      fd.append('file', blob, 'recording.wav')
       return request<{ file_path: string; transcript: string }>(`/campaigns/${campaignId}/audio`, {
         method: 'POST',
         headers: {},
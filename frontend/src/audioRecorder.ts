@@ -1,26 +1,166 @@
+import pcmWorkletUrl from './pcmCapture.worklet.js?url'
+
+// End-of-speech detection: once the player has spoken, this much continuous quiet ends the recording
+const SILENCE_RMS = 0.01
+const SILENCE_MS = 1200
+const VAD_INTERVAL_MS = 100
+// Whisper's native input: recordings are uploaded as 16 kHz mono 16-bit WAV, which the STT
+// service reads directly instead of demuxing and decoding a compressed container with ffmpeg
+const TARGET_RATE = 16000
+
+interface PcmMessage {
+  samples: Float32Array
+  last: boolean
+}
+
 export class AudioRecorder {
-  private mediaRecorder: MediaRecorder | null = null
-  private chunks: Blob[] = []
+  private ready: Promise<AudioContext> | null = null
+  private stream: MediaStream | null = null
+  private source: MediaStreamAudioSourceNode | null = null
+  private capture: AudioWorkletNode | null = null
+  private chunks: Float32Array[] = []
+  private vadTimer: number | null = null
 
-  async start(): Promise<void> {
-    const stream = await navigator.mediaDevices.getUserMedia({ audio: true })
-    this.chunks = []
-    this.mediaRecorder = new MediaRecorder(stream, { mimeType: 'audio/webm' })
-    this.mediaRecorder.ondataavailable = (e) => {
-      if (e.data.size > 0) this.chunks.push(e.data)
+  // Creates the audio context and loads the capture worklet ahead of the first recording, then
+  // keeps both for every later one — pressing Record starts capturing as soon as the mic is open
+  // instead of after a module fetch, so the first words aren't clipped
+  prepare(): Promise<AudioContext> {
+    if (!this.ready) {
+      const ctx = new AudioContext()
+      this.ready = ctx.audioWorklet.addModule(pcmWorkletUrl).then(() => ctx)
+      this.ready.catch(() => {
+        this.ready = null
+      })
     }
-    this.mediaRecorder.start()
+    return this.ready
+  }
+
+  close(): void {
+    const ready = this.ready
+    this.ready = null
+    ready?.then((ctx) => ctx.close()).catch(() => {})
   }
 
-  stop(): Promise<Blob> {
-    return new Promise((resolve, reject) => {
-      if (!this.mediaRecorder) return reject(new Error('Not recording'))
-      this.mediaRecorder.onstop = () => {
-        const blob = new Blob(this.chunks, { type: 'audio/webm' })
-        this.mediaRecorder?.stream.getTracks().forEach((t) => t.stop())
-        resolve(blob)
+  // onSilence fires once when the player stops talking, so the clip can be sent without
+  // waiting for them to press Stop
+  async start(onSilence?: () => void): Promise<void> {
+    // Echo cancellation keeps DM/NPC speech still playing out of the speakers off the recording
+    const [stream, ctx] = await Promise.all([
+      navigator.mediaDevices.getUserMedia({ audio: { echoCancellation: true } }),
+      this.prepare(),
+    ])
+    await ctx.resume()
+    // No outputs: the node is a sink, so nothing is played back but it is still processed
+    const capture = new AudioWorkletNode(ctx, 'pcm-capture', { numberOfOutputs: 0 })
+    const source = ctx.createMediaStreamSource(stream)
+    source.connect(capture)
+
+    this.chunks = []
+    capture.port.onmessage = (e: MessageEvent<PcmMessage>) => this.chunks.push(e.data.samples)
+    this.stream = stream
+    this.source = source
+    this.capture = capture
+    if (onSilence) this.watchForSilence(ctx, source, onSilence)
+  }
+
+  async stop(): Promise<Blob> {
+    this.stopWatching()
+    const { stream, source, capture } = this
+    if (!stream || !source || !capture || !this.ready) throw new Error('Not recording')
+    this.stream = null
+    this.source = null
+    this.capture = null
+    const ctx = await this.ready
+
+    // Ask the worklet for its partial block; it arrives after every full block already posted
+    await new Promise<void>((resolve) => {
+      capture.port.onmessage = (e: MessageEvent<PcmMessage>) => {
+        this.chunks.push(e.data.samples)
+        if (e.data.last) resolve()
       }
-      this.mediaRecorder.stop()
+      capture.port.postMessage('flush')
     })
+    source.disconnect()
+    capture.disconnect()
+    capture.port.close()
+    stream.getTracks().forEach((t) => t.stop())
+    await ctx.suspend()
+
+    const samples = await resample(this.chunks, ctx.sampleRate)
+    this.chunks = []
+    return encodeWav(samples, TARGET_RATE)
+  }
+
+  private watchForSilence(ctx: AudioContext, source: MediaStreamAudioSourceNode, onSilence: () => void): void {
+    const analyser = ctx.createAnalyser()
+    source.connect(analyser)
+    const samples = new Float32Array(analyser.fftSize)
+    let heardSpeech = false
+    let quietSince = performance.now()
+
+    this.vadTimer = window.setInterval(() => {
+      analyser.getFloatTimeDomainData(samples)
+      let sum = 0
+      for (let i = 0; i < samples.length; i++) sum += samples[i] * samples[i]
+      const now = performance.now()
+      if (Math.sqrt(sum / samples.length) > SILENCE_RMS) {
+        heardSpeech = true
+        quietSince = now
+      } else if (heardSpeech && now - quietSince > SILENCE_MS) {
+        this.stopWatching()
+        onSilence()
+      }
+    }, VAD_INTERVAL_MS)
+  }
+
+  private stopWatching(): void {
+    if (this.vadTimer !== null) {
+      window.clearInterval(this.vadTimer)
+      this.vadTimer = null
+    }
+  }
+}
+
+// The browser's own resampler (an offline render) takes the device rate down to 16 kHz
+async function resample(chunks: Float32Array[], sampleRate: number): Promise<Float32Array> {
+  const length = chunks.reduce((n, c) => n + c.length, 0)
+  if (length === 0) return new Float32Array(0)
+  const offline = new OfflineAudioContext(1, Math.ceil((length * TARGET_RATE) / sampleRate), TARGET_RATE)
+  const buffer = offline.createBuffer(1, length, sampleRate)
+  let offset = 0
+  for (const chunk of chunks) {
+    buffer.copyToChannel(chunk, 0, offset)
+    offset += chunk.length
+  }
+  const source = offline.createBufferSource()
+  source.buffer = buffer
+  source.connect(offline.destination)
+  source.start()
+  return (await offline.startRendering()).getChannelData(0)
+}
+
+// Canonical 44-byte RIFF header followed by little-endian 16-bit mono PCM
+function encodeWav(samples: Float32Array, sampleRate: number): Blob {
+  const view = new DataView(new ArrayBuffer(44 + samples.length * 2))
+  const writeTag = (offset: number, tag: string) => {
+    for (let i = 0; i < 4; i++) view.setUint8(offset + i, tag.charCodeAt(i))
+  }
+  writeTag(0, 'RIFF')
+  view.setUint32(4, 36 + samples.length * 2, true)
+  writeTag(8, 'WAVE')
+  writeTag(12, 'fmt ')
+  view.setUint32(16, 16, true)
+  view.setUint16(20, 1, true) // PCM
+  view.setUint16(22, 1, true) // mono
+  view.setUint32(24, sampleRate, true)
+  view.setUint32(28, sampleRate * 2, true)
+  view.setUint16(32, 2, true)
+  view.setUint16(34, 16, true)
+  writeTag(36, 'data')
+  view.setUint32(40, samples.length * 2, true)
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i]))
+    view.setInt16(44 + i * 2, s < 0 ? s * 0x8000 : s * 0x7fff, true)
   }
+  return new Blob([view], { type: 'audio/wav' })
 }
@@ -1,4 +1,4 @@
-import { useState, useRef } from 'react'
+import { useEffect, useState, useRef } from 'react'
 import { Spinner } from '../shared/Spinner'
 import { AudioRecorder } from '../../audioRecorder'
 import { api } from '../../api'
@@ -9,15 +9,38 @@ interface Props {
   disabled?: boolean
 }
 
+// Resolves once the current turn has finished. A recording made while the DM is still working or
+// speaking is transcribed immediately, and only the send waits for the turn to end.
+function whenAgentIdle(): Promise<void> {
+  return new Promise((resolve) => {
+    if (!useGameStore.getState().isAgentRunning) return resolve()
+    const unsubscribe = useGameStore.subscribe((s) => {
+      if (!s.isAgentRunning) {
+        unsubscribe()
+        resolve()
+      }
+    })
+  })
+}
+
 export function AudioControls({ campaignId, disabled }: Props) {
   const [recording, setRecording] = useState(false)
   const [uploading, setUploading] = useState(false)
   const recorderRef = useRef(new AudioRecorder())
-  const store = useGameStore()
+  // Actions only — read without subscribing, so the controls don't re-render on every store update
+  const store = useGameStore.getState()
+
+  // Audio setup happens while the page loads, not when the player first presses Record
+  useEffect(() => {
+    const recorder = recorderRef.current
+    recorder.prepare().catch(() => {})
+    return () => recorder.close()
+  }, [])
 
   const startRecording = async () => {
     try {
-      await recorderRef.current.start()
+      // Sends as soon as the player falls silent; the Stop button still ends it early
+      await recorderRef.current.start(() => stopAndSend())
       setRecording(true)
     } catch (e) {
       store.setError('Microphone access denied')
@@ -27,11 +50,12 @@ export function AudioControls({ campaignId, disabled }: Props) {
   const stopAndSend = async () => {
     setRecording(false)
     setUploading(true)
-    store.setAgentRunning(true)
     try {
       const blob = await recorderRef.current.stop()
       const { transcript } = await api.game.uploadAudio(campaignId, blob)
+      await whenAgentIdle()
       store.appendMessage({ role: 'player', content: transcript })
+      store.setAgentRunning(true)
       await api.game.sendMessage(campaignId, transcript)
     } catch (e) {
       store.setError((e as Error).message)
@@ -80,7 +104,7 @@ export function AudioControls({ campaignId, disabled }: Props) {
       </div>
       <div style={{ display: 'flex', gap: 8, alignItems: 'center' }}>
         {!recording ? (
-          <button onClick={startRecording} disabled={disabled || uploading} style={{ padding: '8px 16px', cursor: 'pointer', background: '#fee2e2', border: '1px solid #fca5a5', borderRadius: 6 }}>
+          <button onClick={startRecording} disabled={uploading} style={{ padding: '8px 16px', cursor: 'pointer', background: '#fee2e2', border: '1px solid #fca5a5', borderRadius: 6 }}>
             🎤 Record
           </button>
         ) : (
@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useGameStore } from '../../store'
 import { api } from '../../api'
 import { SceneImage } from './SceneImage'
@@ -11,29 +11,67 @@ import { Spinner } from '../shared/Spinner'
 interface Props { campaignId: string }
 
 export function GameView({ campaignId }: Props) {
-  const store = useGameStore()
+  // One subscription per field, so a change only re-renders what reads it; the SceneImage and NPCBadge
+  // subtrees stay untouched while messages stream in
+  const currentImage = useGameStore((s) => s.currentImage)
+  const activeNPC = useGameStore((s) => s.activeNPC)
+  const isAgentRunning = useGameStore((s) => s.isAgentRunning)
+  const error = useGameStore((s) => s.error)
+  const messages = useGameStore((s) => s.messages)
+  const audioQueue = useGameStore((s) => s.audioQueue)
+  const retractedAudio = useGameStore((s) => s.retractedAudio)
   const [audioPlaying, setAudioPlaying] = useState(false)
+  const preloaded = useRef(new Map<string, HTMLAudioElement>())
+  const playing = useRef<{ path: string; audio: HTMLAudioElement } | null>(null)
 
-  // Drain the audio queue — play one clip at a time
+  // A retracted clip is already out of the queue; stop it here if it is the one playing
   useEffect(() => {
-    if (audioPlaying || store.audioQueue.length === 0) return
-    const path = store.shiftAudio()
+    if (!retractedAudio) return
+    preloaded.current.delete(retractedAudio)
+    if (playing.current?.path === retractedAudio) {
+      playing.current.audio.pause()
+      playing.current = null
+      setAudioPlaying(false)
+    }
+  }, [retractedAudio])
+
+  // Drain the audio queue — play one clip at a time. While a clip plays, the next one is
+  // already requested: speech is synthesized on first fetch, so this overlaps it with playback
+  useEffect(() => {
+    if (audioPlaying) {
+      const next = audioQueue[0]
+      if (next && !preloaded.current.has(next)) {
+        const audio = new Audio(api.mediaUrl(next))
+        audio.preload = 'auto'
+        preloaded.current.set(next, audio)
+      }
+      return
+    }
+    if (audioQueue.length === 0) return
+    const path = useGameStore.getState().shiftAudio()
     if (!path) return
     setAudioPlaying(true)
-    const audio = new Audio(api.mediaUrl(path))
-    audio.onended = () => setAudioPlaying(false)
-    audio.onerror = () => setAudioPlaying(false)
-    audio.play().catch(() => setAudioPlaying(false))
-  }, [audioPlaying, store.audioQueue.length])
+    const audio = preloaded.current.get(path) ?? new Audio(api.mediaUrl(path))
+    preloaded.current.delete(path)
+    playing.current = { path, audio }
+    const finished = () => {
+      if (playing.current?.audio !== audio) return
+      playing.current = null
+      setAudioPlaying(false)
+    }
+    audio.onended = finished
+    audio.onerror = finished
+    audio.play().catch(finished)
+  }, [audioPlaying, audioQueue.length])
 
   return (
     <div style={{ display: 'flex', height: '100vh', flexDirection: 'column' }}>
       <div style={{ display: 'flex', flex: 1, overflow: 'hidden' }}>
         {/* Left: scene image */}
         <div style={{ width: '40%', padding: 16, display: 'flex', flexDirection: 'column', gap: 12, overflowY: 'auto', background: '#0f0f1a' }}>
-          <SceneImage path={store.currentImage} />
-          <NPCBadge npc={store.activeNPC} />
-          {store.isAgentRunning && (
+          <SceneImage path={currentImage} />
+          <NPCBadge npc={activeNPC} />
+          {isAgentRunning && (
             <div style={{ display: 'flex', alignItems: 'center', gap: 8, color: '#aaa' }}>
               <Spinner /> <span>DM is thinking...</span>
             </div>
@@ -41,11 +79,11 @@ export function GameView({ campaignId }: Props) {
         </div>
         {/* Right: transcript */}
         <div style={{ flex: 1, display: 'flex', flexDirection: 'column', background: '#1a1a2e', color: '#e5e7eb' }}>
-          {store.error && (
-            <ErrorBanner message={store.error} onDismiss={() => store.setError(null)} />
+          {error && (
+            <ErrorBanner message={error} onDismiss={() => useGameStore.getState().setError(null)} />
           )}
-          <TranscriptPanel messages={store.messages} />
-          <AudioControls campaignId={campaignId} disabled={store.isAgentRunning} />
+          <TranscriptPanel messages={messages} />
+          <AudioControls campaignId={campaignId} disabled={isAgentRunning} />
         </div>
       </div>
     </div>
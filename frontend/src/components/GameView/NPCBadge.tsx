@@ -1,16 +1,44 @@
+import { memo, useEffect, useRef } from 'react'
 import type { NPC } from '../../store/gameStore'
 import { api } from '../../api'
 
 interface Props { npc: NPC | null }
 
-export function NPCBadge({ npc }: Props) {
+const PORTRAIT_SIZE = 28
+
+// Portraits are generated at 1024×1024 but shown as a 28px avatar; createImageBitmap decodes
+// straight to the displayed resolution instead of decoding every pixel and scaling down afterwards
+function Portrait({ path, name }: { path: string; name: string }) {
+  const canvasRef = useRef<HTMLCanvasElement>(null)
+
+  useEffect(() => {
+    let cancelled = false
+    const px = Math.round(PORTRAIT_SIZE * (window.devicePixelRatio || 1))
+    fetch(api.mediaUrl(path), { credentials: 'include' })
+      .then((res) => res.blob())
+      .then((blob) => createImageBitmap(blob, { resizeWidth: px, resizeHeight: px, resizeQuality: 'medium' }))
+      .then((bitmap) => {
+        const canvas = canvasRef.current
+        if (!cancelled && canvas) {
+          canvas.width = px
+          canvas.height = px
+          canvas.getContext('2d')?.drawImage(bitmap, 0, 0)
+        }
+        bitmap.close()
+      })
+      .catch(() => {}) // the badge still shows the name without a portrait
+    return () => { cancelled = true }
+  }, [path])
+
+  return <canvas ref={canvasRef} role="img" aria-label={name} style={{ width: PORTRAIT_SIZE, height: PORTRAIT_SIZE, borderRadius: '50%' }} />
+}
+
+export const NPCBadge = memo(function NPCBadge({ npc }: Props) {
   if (!npc) return null
   return (
     <div style={{ display: 'flex', alignItems: 'center', gap: 8, padding: '6px 10px', background: '#f0fdf4', border: '1px solid #86efac', borderRadius: 20 }}>
-      {npc.portrait_path && (
-        <img src={api.mediaUrl(npc.portrait_path)} alt={npc.npc_name} style={{ width: 28, height: 28, borderRadius: '50%', objectFit: 'cover' }} />
-      )}
+      {npc.portrait_path && <Portrait path={npc.portrait_path} name={npc.npc_name} />}
       <span style={{ fontWeight: 600, color: '#166534' }}>🗣 {npc.npc_name}</span>
     </div>
   )
-}
+})
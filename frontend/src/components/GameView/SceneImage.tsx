@@ -1,8 +1,29 @@
+import { memo, useEffect, useState } from 'react'
 import { api } from '../../api'
 
 interface Props { path: string | null }
 
-export function SceneImage({ path }: Props) {
-  if (!path) return <div style={{ width: '100%', aspectRatio: '16/9', background: '#1a1a2e', display: 'flex', alignItems: 'center', justifyContent: 'center', color: '#444', borderRadius: 8 }}>No scene yet</div>
-  return <img src={api.mediaUrl(path)} alt="Scene" style={{ width: '100%', borderRadius: 8, objectFit: 'cover' }} />
-}
+// Memoised on path: a new message or audio clip re-renders the game view, but not the scene image
+export const SceneImage = memo(function SceneImage({ path }: Props) {
+  // The previous scene stays up while the next one downloads and decodes off the main thread;
+  // the swap itself is then just a paint of an already-decoded image
+  const [shown, setShown] = useState<string | null>(path)
+
+  useEffect(() => {
+    if (path === shown) return
+    if (!path) {
+      setShown(null)
+      return
+    }
+    let cancelled = false
+    const img = new Image()
+    img.src = api.mediaUrl(path)
+    img.decode()
+      .catch(() => {}) // a failed decode still swaps, and the <img> shows its own fallback
+      .then(() => { if (!cancelled) setShown(path) })
+    return () => { cancelled = true }
+  }, [path, shown])
+
+  if (!shown) return <div style={{ width: '100%', aspectRatio: '16/9', background: '#1a1a2e', display: 'flex', alignItems: 'center', justifyContent: 'center', color: '#444', borderRadius: 8 }}>No scene yet</div>
+  return <img src={api.mediaUrl(shown)} alt="Scene" decoding="async" style={{ width: '100%', borderRadius: 8, objectFit: 'cover' }} />
+})
@@ -1,4 +1,4 @@
-import { useEffect, useRef } from 'react'
+import { memo, useEffect, useRef } from 'react'
 import type { Message } from '../../store/gameStore'
 
 interface Props { messages: Message[] }
@@ -10,23 +10,26 @@ const ROLE_STYLES: Record<string, { label: string; color: string }> = {
   system: { label: '—', color: '#9ca3af' },
 }
 
+// Messages never change once appended, so each row renders once; a new message only renders itself
+const MessageRow = memo(function MessageRow({ message: m }: { message: Message }) {
+  const style = ROLE_STYLES[m.role] ?? ROLE_STYLES.system
+  return (
+    <div>
+      <span style={{ fontWeight: 'bold', color: style.color, marginRight: 8 }}>
+        {m.npcName ?? style.label}:
+      </span>
+      <span>{m.content}</span>
+    </div>
+  )
+})
+
 export function TranscriptPanel({ messages }: Props) {
   const bottomRef = useRef<HTMLDivElement>(null)
   useEffect(() => { bottomRef.current?.scrollIntoView({ behavior: 'smooth' }) }, [messages])
 
   return (
     <div style={{ flex: 1, overflowY: 'auto', padding: '12px 16px', display: 'flex', flexDirection: 'column', gap: 12 }}>
-      {messages.map((m) => {
-        const style = ROLE_STYLES[m.role] ?? ROLE_STYLES.system
-        return (
-          <div key={m.id}>
-            <span style={{ fontWeight: 'bold', color: style.color, marginRight: 8 }}>
-              {m.npcName ?? style.label}:
-            </span>
-            <span>{m.content}</span>
-          </div>
-        )
-      })}
+      {messages.map((m) => <MessageRow key={m.id} message={m} />)}
       <div ref={bottomRef} />
     </div>
   )
@@ -7,20 +7,23 @@ import { ErrorBanner } from '../shared/ErrorBanner'
 interface Props { campaignId: string }
 
 export function CharacterStep({ campaignId }: Props) {
-  const store = useGameStore()
+  const currentImage = useGameStore((s) => s.currentImage)
+  const error = useGameStore((s) => s.error)
+  const messages = useGameStore((s) => s.messages)
+  const isAgentRunning = useGameStore((s) => s.isAgentRunning)
   return (
     <div>
       <h2 style={{ marginBottom: 8 }}>Character Creation</h2>
       <p style={{ color: '#6b7280', marginBottom: 16 }}>Answer the DM's questions to build your character.</p>
-      {store.currentImage && (
+      {currentImage && (
         <div style={{ marginBottom: 16, maxWidth: 300 }}>
-          <SceneImage path={store.currentImage} />
+          <SceneImage path={currentImage} />
         </div>
       )}
-      {store.error && <ErrorBanner message={store.error} onDismiss={() => store.setError(null)} />}
+      {error && <ErrorBanner message={error} onDismiss={() => useGameStore.getState().setError(null)} />}
       <div style={{ border: '1px solid #e5e7eb', borderRadius: 8, display: 'flex', flexDirection: 'column', height: 400 }}>
-        <TranscriptPanel messages={store.messages} />
-        <AudioControls campaignId={campaignId} disabled={store.isAgentRunning} />
+        <TranscriptPanel messages={messages} />
+        <AudioControls campaignId={campaignId} disabled={isAgentRunning} />
       </div>
     </div>
   )
@@ -1,6 +1,7 @@
 import { useEffect } from 'react'
 import { useParams } from 'react-router-dom'
 import { useGameStore } from '../store'
+import type { Message } from '../store/gameStore'
 import { useSSE } from '../sse'
 import { GameView } from '../components/GameView/GameView'
 import { api } from '../api'
@@ -9,26 +10,35 @@ const OPENING_SENTINEL = '__opening_scene__'
 
 export function PlayPage() {
   const { id = '' } = useParams<{ id: string }>()
-  const store = useGameStore()
-
   useSSE(id)
 
   useEffect(() => {
+    // The store holds one campaign at a time; a history that arrives after the player has already
+    // switched to another campaign must not be mixed into it
+    let stale = false
+    const store = useGameStore.getState()
     store.reset()
     store.setPhase('active')
     api.game.getTurns(id, 50, true).then((turns) => {
+      if (stale) return
+      let latestImage: string | null = null
+      const history: Omit<Message, 'id'>[] = []
       for (const t of turns) {
         if (t.role !== 'system') {
-          store.appendMessage({ role: t.role, content: t.content, npcName: t.npc_name ?? undefined })
+          history.push({ role: t.role, content: t.content, npcName: t.npc_name ?? undefined })
         }
-        if (t.image_path) store.setCurrentImage(t.image_path)
+        if (t.image_path) latestImage = t.image_path
       }
+      store.appendMessages(history)
+      // Only the newest scene is shown, so only it is loaded
+      if (latestImage) store.setCurrentImage(latestImage)
       // Trigger opening scene if no turns yet
       if (turns.length === 0) {
         api.game.sendMessage(id, OPENING_SENTINEL).catch(() => {})
         store.setAgentRunning(true)
       }
     })
+    return () => { stale = true }
   }, [id])
 
   return <GameView campaignId={id} />
@@ -7,17 +7,19 @@ import { api } from '../api'
 
 export function SetupPage() {
   const { id = '' } = useParams<{ id: string }>()
-  const store = useGameStore()
-
   useSSE(id)
 
   useEffect(() => {
+    // Responses for a campaign the player has already left are dropped, as in PlayPage
+    let stale = false
+    const store = useGameStore.getState()
     store.reset()
     // Load existing turns and set initial phase
     api.campaigns.get(id).then((c) => {
-      store.setPhase(c.phase)
+      if (!stale) store.setPhase(c.phase)
     })
     api.game.getTurns(id, 50).then((turns) => {
+      if (stale) return
       for (const t of turns) {
         if (t.role !== 'system') {
           store.appendMessage({ role: t.role, content: t.content, npcName: t.npc_name ?? undefined })
@@ -29,6 +31,7 @@ export function SetupPage() {
         store.setAgentRunning(true)
       }
     })
+    return () => { stale = true }
   }, [id])
 
   return <SetupWizard campaignId={id} />
@@ -0,0 +1,37 @@
+// Collects raw mono samples on the audio thread and hands them to the page in blocks; each block's
+// buffer is transferred rather than copied. Any message from the page flushes the partial block
+// and ends the node — each recording creates its own, so a finished one lets the browser collect it.
+const BLOCK_FRAMES = 4096
+
+class PcmCapture extends AudioWorkletProcessor {
+  constructor() {
+    super()
+    this.block = new Float32Array(BLOCK_FRAMES)
+    this.length = 0
+    this.flushed = false
+    this.port.onmessage = () => {
+      const tail = this.block.slice(0, this.length)
+      this.length = 0
+      this.flushed = true
+      this.port.postMessage({ samples: tail, last: true }, [tail.buffer])
+    }
+  }
+
+  process(inputs) {
+    if (this.flushed) return false
+    const channel = inputs[0] && inputs[0][0]
+    if (channel) {
+      this.block.set(channel, this.length)
+      this.length += channel.length
+      if (this.length + channel.length > BLOCK_FRAMES) {
+        const full = this.block.subarray(0, this.length)
+        this.port.postMessage({ samples: full, last: false }, [this.block.buffer])
+        this.block = new Float32Array(BLOCK_FRAMES)
+        this.length = 0
+      }
+    }
+    return true
+  }
+}
+
+registerProcessor('pcm-capture', PcmCapture)
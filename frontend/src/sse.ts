@@ -4,10 +4,12 @@ import { useGameStore } from './store'
 import { api } from './api'
 
 export function useSSE(campaignId: string) {
-  const store = useGameStore()
   const navigate = useNavigate()
 
   useEffect(() => {
+    // Only actions are used here, so the hook reads them without subscribing; the page that calls it is
+    // not re-rendered by every event it handles
+    const store = useGameStore.getState()
     const base = (import.meta.env.VITE_API_BASE_URL ?? '/api/v1').replace(/\/$/, '')
     const source = new EventSource(`${base}/campaigns/${campaignId}/stream`, { withCredentials: true })
 
@@ -20,6 +22,10 @@ export function useSSE(campaignId: string) {
           store.appendMessage({ role: 'dm', content: payload.content })
           store.setAgentRunning(false)
           break
+        case 'dm_text_retracted':
+          store.retractMessage('dm', payload.content)
+          if (payload.stream_path) store.retractAudio(payload.stream_path)
+          break
         case 'npc_speech':
           store.appendMessage({ role: 'npc', content: payload.content, npcName: payload.npc_name })
           store.setAgentRunning(false)
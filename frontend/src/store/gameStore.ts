@@ -16,15 +16,19 @@ interface GameState {
   messages: Message[]
   currentImage: string | null
   audioQueue: string[]
+  retractedAudio: string | null
   activeNPC: NPC | null
   phase: string
   isAgentRunning: boolean
   error: string | null
 
   appendMessage: (msg: Omit<Message, 'id'>) => void
+  appendMessages: (msgs: Omit<Message, 'id'>[]) => void
   setCurrentImage: (path: string) => void
   enqueueAudio: (path: string) => void
   shiftAudio: () => string | undefined
+  retractMessage: (role: Message['role'], content: string) => void
+  retractAudio: (path: string) => void
   setActiveNPC: (npc: NPC) => void
   clearActiveNPC: () => void
   setPhase: (phase: string) => void
@@ -37,6 +41,7 @@ export const useGameStore = create<GameState>((set, get) => ({
   messages: [],
   currentImage: null,
   audioQueue: [],
+  retractedAudio: null,
   activeNPC: null,
   phase: 'character_creation',
   isAgentRunning: false,
@@ -46,13 +51,32 @@ export const useGameStore = create<GameState>((set, get) => ({
     set((s) => ({
       messages: [...s.messages, { ...msg, id: crypto.randomUUID() }],
     })),
-  setCurrentImage: (path) => set({ currentImage: path }),
+  // A whole history in one update: one array copy and one render instead of one per message
+  appendMessages: (msgs) =>
+    set((s) => ({
+      messages: s.messages.concat(msgs.map((msg) => ({ ...msg, id: crypto.randomUUID() }))),
+    })),
+  // Returning the same state object skips notifying subscribers when the image hasn't changed
+  setCurrentImage: (path) => set((s) => (s.currentImage === path ? s : { currentImage: path })),
   enqueueAudio: (path) => set((s) => ({ audioQueue: [...s.audioQueue, path] })),
   shiftAudio: () => {
     const [next, ...rest] = get().audioQueue
     set({ audioQueue: rest })
     return next
   },
+  // Removes the newest matching message; returning the same state skips the update when there is none
+  retractMessage: (role, content) =>
+    set((s) => {
+      for (let i = s.messages.length - 1; i >= 0; i--) {
+        if (s.messages[i].role === role && s.messages[i].content === content) {
+          return { messages: [...s.messages.slice(0, i), ...s.messages.slice(i + 1)] }
+        }
+      }
+      return s
+    }),
+  // Drops a clip from the queue; GameView stops it if it is already playing
+  retractAudio: (path) =>
+    set((s) => ({ audioQueue: s.audioQueue.filter((p) => p !== path), retractedAudio: path })),
   setActiveNPC: (npc) => set({ activeNPC: npc }),
   clearActiveNPC: () => set({ activeNPC: null }),
   setPhase: (phase) => set({ phase }),
@@ -63,6 +87,7 @@ export const useGameStore = create<GameState>((set, get) => ({
       messages: [],
       currentImage: null,
       audioQueue: [],
+      retractedAudio: null,
       activeNPC: null,
       phase: 'character_creation',
       isAgentRunning: false,
@@ -1,23 +1,43 @@
-import json
 import os
+from typing import Any, Literal
+
 import httpx
+from pydantic import BaseModel, Field, ValidationError
 
 LLM_SERVICE_URL = os.environ.get('LLM_SERVICE_URL', 'http://llm-service:9001')
 
 EXTRACTION_SYSTEM = """Extract named entities and relationships from the D&D narrative text.
-Return JSON matching this exact schema:
-{
-  "nodes": [
-    {"label": "NPC|Location|Faction|Item|Event", "name": "string", "properties": {...}}
-  ],
-  "relationships": [
-    {"from_label": "...", "from_name": "...", "type": "LIVES_IN|MEMBER_OF|ALLIED_WITH|HOSTILE_TO|CONTROLS|VISITED|INVOLVES|OWNS|LOCATED_IN", "to_label": "...", "to_name": "...", "properties": {...}}
-  ]
-}
 Only extract clearly named entities. Return empty lists if none found."""
 
 
-async def extract_entities(text: str) -> dict:
+class ExtractedNode(BaseModel):
+    label: Literal['NPC', 'Location', 'Faction', 'Item', 'Event'] = 'NPC'
+    name: str = ''
+    properties: dict[str, Any] = Field(default_factory=dict)
+
+
+class ExtractedRelationship(BaseModel):
+    from_label: Literal['NPC', 'Location', 'Faction', 'Item', 'Event'] = 'NPC'
+    from_name: str = ''
+    type: Literal[
+        'LIVES_IN', 'MEMBER_OF', 'ALLIED_WITH', 'HOSTILE_TO', 'CONTROLS', 'VISITED', 'INVOLVES', 'OWNS', 'LOCATED_IN'
+    ] = 'INVOLVES'
+    to_label: Literal['NPC', 'Location', 'Faction', 'Item', 'Event'] = 'NPC'
+    to_name: str = ''
+    properties: dict[str, Any] = Field(default_factory=dict)
+
+
+class Extraction(BaseModel):
+    nodes: list[ExtractedNode] = Field(default_factory=list)
+    relationships: list[ExtractedRelationship] = Field(default_factory=list)
+
+
+# Sent as the response schema, so the provider constrains decoding to it rather than the
+# prompt describing the shape and the reply being parsed on trust
+EXTRACTION_SCHEMA = Extraction.model_json_schema()
+
+
+async def extract_entities(text: str) -> Extraction:
     async with httpx.AsyncClient(timeout=30) as client:
         resp = await client.post(
             f'{LLM_SERVICE_URL}/generate',
@@ -27,12 +47,13 @@ async def extract_entities(text: str) -> dict:
                     {'role': 'user', 'content': text},
                 ],
                 'response_format': 'json',
+                'response_json_schema': EXTRACTION_SCHEMA,
                 'cache': True,
             },
         )
         resp.raise_for_status()
         data = resp.json()
     try:
-        return json.loads(data['text'])
-    except (json.JSONDecodeError, KeyError):
-        return {'nodes': [], 'relationships': []}
+        return Extraction.model_validate_json(data['text'])
+    except (ValidationError, KeyError):
+        return Extraction()
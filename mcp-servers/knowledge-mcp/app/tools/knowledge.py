@@ -1,4 +1,7 @@
+from collections import defaultdict
+
 from fastapi import APIRouter, Request
+from neo4j import AsyncManagedTransaction
 from pydantic import BaseModel
 from typing import Optional
 
@@ -31,95 +34,111 @@ class GetWorldContextOut(BaseModel):
 async def update_world(body: UpdateWorldIn, request: Request):
     campaign_id = request.state.campaign_id
     extracted = await extract_entities(body.narrative_text)
-    nodes = extracted.get('nodes', [])
-    relationships = extracted.get('relationships', [])
-
-    driver = get_driver()
-    entities_added = 0
-    rels_added = 0
 
-    async with driver.session() as session:
-        for node in nodes:
-            label = node.get('label', 'NPC')
-            name = node.get('name', '')
-            if not name:
-                continue
-            props = node.get('properties', {})
-            props['campaign_id'] = campaign_id
-            props['name'] = name
-            cypher = f'MERGE (n:{label} {{campaign_id: $campaign_id, name: $name}}) SET n += $props'
-            await session.run(cypher, campaign_id=campaign_id, name=name, props=props)
-            entities_added += 1
-
-        for rel in relationships:
-            from_label = rel.get('from_label', 'NPC')
-            from_name = rel.get('from_name', '')
-            to_label = rel.get('to_label', 'NPC')
-            to_name = rel.get('to_name', '')
-            rel_type = rel.get('type', 'INVOLVES')
-            rel_props = rel.get('properties', {})
-            if not from_name or not to_name:
-                continue
-            cypher = (
-                f'MATCH (a:{from_label} {{campaign_id: $cid, name: $from_name}}) '
-                f'MATCH (b:{to_label} {{campaign_id: $cid, name: $to_name}}) '
-                f'MERGE (a)-[r:{rel_type}]->(b) SET r += $props'
+    # Rows are grouped by label (relationship type) and each group is written with one UNWIND,
+    # instead of one round-trip per extracted entity and relationship
+    node_rows: dict[str, list[dict]] = defaultdict(list)
+    for node in extracted.nodes:
+        if node.name:
+            props = {**node.properties, 'campaign_id': campaign_id, 'name': node.name}
+            node_rows[node.label].append({'name': node.name, 'props': props})
+
+    rel_rows: dict[tuple[str, str, str], list[dict]] = defaultdict(list)
+    for rel in extracted.relationships:
+        if rel.from_name and rel.to_name:
+            rel_rows[(rel.from_label, rel.type, rel.to_label)].append(
+                {'from_name': rel.from_name, 'to_name': rel.to_name, 'props': rel.properties}
             )
-            await session.run(cypher, cid=campaign_id, from_name=from_name, to_name=to_name, props=rel_props)
-            rels_added += 1
 
+    if node_rows or rel_rows:
+        # One managed write transaction for the whole turn: a single commit instead of one per UNWIND,
+        # retried as a unit on transient errors, and a turn's entities never land without their relationships
+        async with get_driver().session() as session:
+            await session.execute_write(_write_world, campaign_id, node_rows, rel_rows)
+
+    entities_added = sum(len(rows) for rows in node_rows.values())
+    rels_added = sum(len(rows) for rows in rel_rows.values())
     return UpdateWorldOut(entities_added=entities_added, relationships_added=rels_added)
 
 
+async def _write_world(
+    tx: AsyncManagedTransaction,
+    campaign_id: str,
+    node_rows: dict[str, list[dict]],
+    rel_rows: dict[tuple[str, str, str], list[dict]],
+) -> None:
+    for label, rows in node_rows.items():
+        # Labels come from the schema's Literal set, so they are safe to interpolate into Cypher
+        result = await tx.run(
+            'UNWIND $rows AS row '
+            f'MERGE (n:{label} {{campaign_id: $campaign_id, name: row.name}}) SET n += row.props',
+            rows=rows,
+            campaign_id=campaign_id,
+        )
+        await result.consume()
+
+    for (from_label, rel_type, to_label), rows in rel_rows.items():
+        result = await tx.run(
+            'UNWIND $rows AS row '
+            f'MATCH (a:{from_label} {{campaign_id: $cid, name: row.from_name}}) '
+            f'MATCH (b:{to_label} {{campaign_id: $cid, name: row.to_name}}) '
+            f'MERGE (a)-[r:{rel_type}]->(b) SET r += row.props',
+            rows=rows,
+            cid=campaign_id,
+        )
+        await result.consume()
+
+
 @router.post('/tools/get_world_context', response_model=GetWorldContextOut)
 async def get_world_context(body: GetWorldContextIn, request: Request):
     campaign_id = request.state.campaign_id
     driver = get_driver()
 
+    # Each node comes back with its first 1-hop relationships already collected, so the whole
+    # context is one round-trip instead of one relationship query per entity
+    rels_subquery = (
+        'COLLECT { MATCH (node)-[r]->(m) '
+        'RETURN {rel_type: type(r), target: m.name, props: properties(r)} LIMIT 5 } AS rels'
+    )
     async with driver.session() as session:
         if body.focus_text:
             result = await session.run(
                 "CALL db.index.fulltext.queryNodes('entity_search', $query) "
                 'YIELD node, score '
                 'WHERE node.campaign_id = $campaign_id '
-                'RETURN node, score ORDER BY score DESC LIMIT 10',
+                'WITH node, score ORDER BY score DESC LIMIT 10 '
+                f'RETURN node.name AS name, labels(node)[0] AS label, {rels_subquery}',
                 query=body.focus_text,
                 campaign_id=campaign_id,
             )
-            focus_nodes = [r['node'] for r in await result.data()]
         else:
             result = await session.run(
-                'MATCH (n) WHERE n.campaign_id = $campaign_id RETURN n LIMIT $limit',
+                'MATCH (node) WHERE node.campaign_id = $campaign_id '
+                'WITH node LIMIT $limit '
+                f'RETURN node.name AS name, labels(node)[0] AS label, {rels_subquery}',
                 campaign_id=campaign_id,
                 limit=MAX_NODES,
             )
-            focus_nodes = [r['n'] for r in await result.data()]
-
-        entity_lines: list[str] = []
-        rel_lines: list[str] = []
-
-        for node in focus_nodes:
-            label = list(node.labels)[0] if node.labels else 'Entity'
-            name = node.get('name', '?')
-            entity_lines.append(f'- [{label}] {name}')
-
-            # 1-hop relationships
-            rel_result = await session.run(
-                'MATCH (n {campaign_id: $cid, name: $name})-[r]->(m) '
-                'RETURN type(r) as rel_type, m.name as target, properties(r) as props LIMIT 5',
-                cid=campaign_id,
-                name=name,
-            )
-            for rr in await rel_result.data():
-                props_str = ', '.join(f'{k}: {v}' for k, v in (rr['props'] or {}).items())
-                suffix = f' ({props_str})' if props_str else ''
-                rel_lines.append(f'- {name} {rr["rel_type"]} {rr["target"]}{suffix}')
+        records = await result.data()
 
-    if not entity_lines:
+    if not records:
         return GetWorldContextOut(context='## World Context\nNo world data available yet.')
 
-    context = '## World Context\n### Entities\n'
-    context += '\n'.join(entity_lines)
-    if rel_lines:
-        context += '\n### Relationships\n' + '\n'.join(rel_lines)
-    return GetWorldContextOut(context=context)
+    # The whole context is built as one list of lines and joined once at the end
+    entity_lines: list[str] = ['## World Context', '### Entities']
+    rel_lines: list[str] = ['### Relationships']
+
+    for record in records:
+        # Name and label are projected in the query — data() turns whole nodes into plain dicts
+        label = record['label'] or 'Entity'
+        name = record['name'] or '?'
+        entity_lines.append(f'- [{label}] {name}')
+
+        for rr in record['rels']:
+            props_str = ', '.join(f'{k}: {v}' for k, v in (rr['props'] or {}).items())
+            suffix = f' ({props_str})' if props_str else ''
+            rel_lines.append(f'- {name} {rr["rel_type"]} {rr["target"]}{suffix}')
+
+    if len(rel_lines) > 1:
+        entity_lines.extend(rel_lines)
+    return GetWorldContextOut(context='\n'.join(entity_lines))
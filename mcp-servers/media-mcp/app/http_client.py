@@ -0,0 +1,20 @@
+import httpx
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    # One pooled client for the process: keep-alive connections to the image, TTS and STT
+    # services are reused instead of opening a new TCP connection per call.
+    # Timeouts are set per request.
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(limits=httpx.Limits(max_connections=32, max_keepalive_connections=8))
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,10 +1,16 @@
 from fastapi import FastAPI
 from shared.middleware import CampaignIDMiddleware
+from .http_client import close_client
 from .tools import image, tts, stt
 
 app = FastAPI(title='media-mcp')
 app.add_middleware(CampaignIDMiddleware)
 
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    await close_client()
+
 app.include_router(image.router)
 app.include_router(tts.router)
 app.include_router(stt.router)
@@ -1,21 +1,44 @@
-import base64
+import asyncio
+import hashlib
 import os
-import time
+import random
 import uuid
+from collections import OrderedDict
 from pathlib import Path
 
 import httpx
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from ..http_client import get_client
+
 IMAGE_SERVICE_URL = os.environ.get('IMAGE_SERVICE_URL', 'http://image-service:9002')
 MEDIA_ROOT = os.environ.get('MEDIA_ROOT', '/media')
 
 NEGATIVE_PROMPT = 'blurry, low quality, distorted, text, watermark, ugly, deformed'
 PORTRAIT_NEGATIVE = f'{NEGATIVE_PROMPT}, multiple people, crowd'
+# Prompt tails built once per image type rather than re-formatted on every call
+_NEGATIVE_SUFFIX = {
+    'scene': f'\n\nNegative: {NEGATIVE_PROMPT}',
+    'portrait': f'\n\nNegative: {PORTRAIT_NEGATIVE}',
+}
+
+# Transient image-service failures (provider rate limits, restarts) are retried with full-jitter
+# backoff so several agents failing together don't all come back on the same tick
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Recently served image keys kept in-process, so a recurring scene skips even the directory scan
+IMAGE_CACHE_SIZE = 256
+# Formats the image service can return, i.e. the extensions a cached image can have on disk
+IMAGE_EXTENSIONS = ('jpeg', 'png', 'webp')
 
 router = APIRouter()
 
+_recent: OrderedDict[str, str] = OrderedDict()  # key -> file_path relative to MEDIA_ROOT
+# Per-key in-flight generations, so the same prompt requested twice at once is generated once
+_inflight: dict[str, asyncio.Future[str]] = {}
+
 
 class GenerateImageIn(BaseModel):
     prompt: str
@@ -29,21 +52,88 @@ class GenerateImageOut(BaseModel):
 
 @router.post('/tools/generate_image', response_model=GenerateImageOut)
 async def generate_image(body: GenerateImageIn) -> GenerateImageOut:
-    neg = PORTRAIT_NEGATIVE if body.type == 'portrait' else NEGATIVE_PROMPT
-    full_prompt = f'{body.style}\n\n{body.prompt}\n\nNegative: {neg}'
-
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            f'{IMAGE_SERVICE_URL}/generate',
-            json={'prompt': full_prompt, 'style': body.style, 'type': body.type},
-        )
-        resp.raise_for_status()
-        data = resp.json()
-
-    image_bytes = base64.b64decode(data['image_bytes'])
-    ext = data.get('format', 'jpeg')
-    filename = f'{int(time.time())}_{uuid.uuid4().hex[:8]}.{ext}'
-    dest = Path(MEDIA_ROOT) / 'images' / filename
+    suffix = _NEGATIVE_SUFFIX.get(body.type, _NEGATIVE_SUFFIX['scene'])
+    full_prompt = f'{body.style}\n\n{body.prompt}{suffix}'
+
+    # Content-addressed file name: the same prompt always maps to the same image, so a repeated
+    # scene or portrait is served from disk without another generation call
+    key = hashlib.blake2b(f'{body.type}\0{full_prompt}'.encode(), digest_size=16).hexdigest()
+    file_path = _recent.get(key)
+    if file_path is not None:
+        _recent.move_to_end(key)
+        return GenerateImageOut(file_path=file_path)
+    if key in _inflight:
+        return GenerateImageOut(file_path=await asyncio.shield(_inflight[key]))
+
+    future: asyncio.Future[str] = asyncio.get_event_loop().create_future()
+    _inflight[key] = future
+    try:
+        file_path = await _generate(key, full_prompt, body)
+        future.set_result(file_path)
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved — there may be no other waiter to observe it
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        _inflight.pop(key, None)
+
+    _recent[key] = file_path
+    while len(_recent) > IMAGE_CACHE_SIZE:
+        _recent.popitem(last=False)
+    return GenerateImageOut(file_path=file_path)
+
+
+async def _generate(key: str, full_prompt: str, body: GenerateImageIn) -> str:
+    images_dir = Path(MEDIA_ROOT) / 'images'
+    existing = await asyncio.to_thread(_find_existing, images_dir, key)
+    if existing is not None:
+        return existing
+
+    resp = await _post_with_retry(
+        f'{IMAGE_SERVICE_URL}/generate/raw',
+        {'prompt': full_prompt, 'style': body.style, 'type': body.type},
+    )
+
+    ext = resp.headers.get('content-type', 'image/jpeg').removeprefix('image/')
+    filename = f'{key}.{ext}'
+    await asyncio.to_thread(_write_atomic, images_dir / filename, resp.content)
+    return f'images/{filename}'
+
+
+async def _post_with_retry(url: str, payload: dict) -> httpx.Response:
+    for attempt in range(RETRY_ATTEMPTS):
+        retry_after = None
+        try:
+            resp = await get_client().post(url, json=payload, timeout=60)
+            if resp.status_code not in RETRY_STATUSES:
+                resp.raise_for_status()
+                return resp
+            retry_after = resp.headers.get('retry-after')
+        except httpx.TransportError:
+            pass
+        delay = random.uniform(0, RETRY_BASE_DELAY * 2**attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        await asyncio.sleep(delay)
+
+    resp = await get_client().post(url, json=payload, timeout=60)
+    resp.raise_for_status()
+    return resp
+
+
+def _find_existing(images_dir: Path, key: str) -> str | None:
+    # A few direct stat() calls rather than a glob, which lists the whole (ever-growing) images directory
+    for ext in IMAGE_EXTENSIONS:
+        if (images_dir / f'{key}.{ext}').exists():
+            return f'images/{key}.{ext}'
+    return None
+
+
+def _write_atomic(dest: Path, data: bytes) -> None:
+    # One write to a temp name, then rename, so /media never serves a half-written image
     dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_bytes(image_bytes)
-    return GenerateImageOut(file_path=f'images/{filename}')
+    tmp = dest.with_name(f'{dest.name}.{uuid.uuid4().hex[:8]}.tmp')
+    tmp.write_bytes(data)
+    tmp.replace(dest)
@@ -1,10 +1,12 @@
+import asyncio
 import os
 from pathlib import Path
 
-import httpx
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from ..http_client import get_client
+
 STT_SERVICE_URL = os.environ.get('STT_SERVICE_URL', 'http://stt-service:9004')
 MEDIA_ROOT = os.environ.get('MEDIA_ROOT', '/media')
 
@@ -21,21 +23,19 @@ class TranscribeOut(BaseModel):
 
 @router.post('/tools/transcribe', response_model=TranscribeOut)
 async def transcribe(body: TranscribeIn):
-    import base64
-
     abs_path = Path(MEDIA_ROOT) / body.file_path
-    audio_bytes = abs_path.read_bytes()
+    audio_bytes = await asyncio.to_thread(abs_path.read_bytes)
     ext = abs_path.suffix.lstrip('.')
 
-    async with httpx.AsyncClient(timeout=120) as client:
-        resp = await client.post(
-            f'{STT_SERVICE_URL}/transcribe',
-            json={
-                'audio_bytes': base64.b64encode(audio_bytes).decode(),
-                'format': ext or 'wav',
-            },
-        )
-        resp.raise_for_status()
-        data = resp.json()
+    # The recording goes over as the raw request body rather than base64 inside JSON
+    resp = await get_client().post(
+        f'{STT_SERVICE_URL}/transcribe/raw',
+        params={'format': ext or 'wav'},
+        content=audio_bytes,
+        headers={'Content-Type': 'application/octet-stream'},
+        timeout=120,
+    )
+    resp.raise_for_status()
+    data = resp.json()
 
     return TranscribeOut(text=data['text'])
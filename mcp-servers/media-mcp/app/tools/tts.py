@@ -1,15 +1,18 @@
 import asyncio
 import hashlib
-import json
 import os
+import struct
 from pathlib import Path
+from typing import BinaryIO
 
-import httpx
+import orjson
 import redis.asyncio as aioredis
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
+from ..http_client import get_client
+
 TTS_SERVICE_URL = os.environ.get('TTS_SERVICE_URL', 'http://tts-service:9003')
 MEDIA_ROOT = os.environ.get('MEDIA_ROOT', '/media')
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/1')
@@ -18,8 +21,44 @@ PARAMS_TTL = 3600  # 1 hour — only needed until first stream fetch caches the
 router = APIRouter()
 
 _redis: aioredis.Redis | None = None
-# Per-key events to deduplicate concurrent generation requests for the same audio
-_generation_events: dict[str, asyncio.Event] = {}
+
+
+class _Generation:
+    """Chunks of a clip received so far; followers are woken on each new chunk rather than polling the file."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.done = False
+        self.failed = False
+        self.changed = asyncio.Condition()
+
+    async def push(self, chunk: bytes | None, failed: bool = False) -> None:
+        # None marks the end of the stream; failed says it was cut short rather than completed
+        if chunk is None:
+            self.done = True
+            self.failed = failed
+        else:
+            self.chunks.append(chunk)
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def follow(self):
+        sent = 0
+        while True:
+            while sent < len(self.chunks):
+                yield self.chunks[sent]
+                sent += 1
+            if self.done:
+                if self.failed:
+                    # Raising aborts the follower's response, so its client sees an error, not a truncated clip
+                    raise RuntimeError('TTS generation failed before the clip was complete')
+                return
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.done or len(self.chunks) > sent)
+
+
+# Clips currently streaming from tts-service, by key, so concurrent requests share one generation
+_generations: dict[str, _Generation] = {}
 
 
 def get_redis() -> aioredis.Redis:
@@ -41,72 +80,111 @@ class SpeakOut(BaseModel):
 
 @router.post('/tools/speak', response_model=SpeakOut)
 async def speak(body: SpeakIn) -> SpeakOut:
-    cache_key = hashlib.sha256(f'{body.text}:{body.voice_id}:{body.voice_instructions}'.encode()).hexdigest()
+    # BLAKE2b is faster than SHA-256 on 64-bit CPUs; NUL separators keep fields unambiguous
+    raw = '\0'.join((body.text, body.voice_id, body.voice_instructions))
+    cache_key = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
 
     # Store params so the stream endpoint can generate on demand
     await get_redis().setex(
         f'tts:params:{cache_key}',
         PARAMS_TTL,
-        json.dumps({'text': body.text, 'voice_id': body.voice_id, 'voice_instructions': body.voice_instructions}),
+        orjson.dumps({'text': body.text, 'voice_id': body.voice_id, 'voice_instructions': body.voice_instructions}),
     )
 
     return SpeakOut(stream_path=f'audio/stream/{cache_key}')
 
 
 @router.get('/audio/stream/{cache_key}')
-async def stream_audio(cache_key: str) -> StreamingResponse:
+async def stream_audio(cache_key: str) -> Response:
     dest = Path(MEDIA_ROOT) / 'audio' / f'{cache_key}.wav'
 
-    if dest.exists():
-        return StreamingResponse(
-            _file_chunks(dest),
-            media_type='audio/wav',
-            headers={'Cache-Control': 'public, max-age=86400'},
-        )
+    if await asyncio.to_thread(dest.exists):
+        # FileResponse reads on a worker thread, so serving a cached clip never blocks the event loop
+        return FileResponse(dest, media_type='audio/wav', headers={'Cache-Control': 'public, max-age=86400'})
 
     params_json = await get_redis().get(f'tts:params:{cache_key}')
     if not params_json:
         raise HTTPException(status_code=404, detail='Audio not found')
-    params = json.loads(params_json)
+    params = orjson.loads(params_json)
 
-    # If another request is already generating this key, wait then serve from disk
-    if cache_key in _generation_events:
-        await _generation_events[cache_key].wait()
-        if dest.exists():
-            return StreamingResponse(_file_chunks(dest), media_type='audio/wav')
-        raise HTTPException(status_code=500, detail='Audio generation failed')
-
-    event = asyncio.Event()
-    _generation_events[cache_key] = event
+    # If another request is already generating this key, follow its stream as it arrives
+    # instead of waiting for the whole clip to land on disk
+    generation = _generations.get(cache_key)
+    if generation is not None:
+        return StreamingResponse(generation.follow(), media_type='audio/wav')
 
     async def _stream_and_save():
-        dest.parent.mkdir(parents=True, exist_ok=True)
+        # Registered once the body starts, not before: a client that disconnects first never starts this
+        # generator, so its cleanup below would never run and followers would wait on the entry forever.
+        # Checked again with no await in between, in case another request started the key meanwhile
+        existing = _generations.get(cache_key)
+        if existing is not None:
+            async for chunk in existing.follow():
+                yield chunk
+            return
+        generation = _generations[cache_key] = _Generation()
         tmp = dest.with_suffix('.tmp')
-        f = open(tmp, 'wb')
+        failed = True
         try:
-            async with httpx.AsyncClient(timeout=90) as client:
-                async with client.stream('POST', f'{TTS_SERVICE_URL}/speak/stream', json=params) as resp:
+            # Creating, closing and renaming the file touch the filesystem, so they run on a worker thread;
+            # the per-chunk writes only fill the file's buffer and stay on the loop
+            f = await asyncio.to_thread(_open_tmp, tmp)
+            try:
+                # The wav on disk is the cache of record — tell tts-service not to keep a Redis copy
+                async with get_client().stream(
+                    'POST', f'{TTS_SERVICE_URL}/speak/stream', json={**params, 'cache': False}, timeout=90
+                ) as resp:
                     resp.raise_for_status()
-                    async for chunk in resp.aiter_bytes(4096):
+                    async for chunk in resp.aiter_bytes():
                         f.write(chunk)
+                        await generation.push(chunk)
                         yield chunk
-            f.close()
-            tmp.rename(dest)
-        except Exception:
-            f.close()
-            tmp.unlink(missing_ok=True)
-            raise
+                await asyncio.to_thread(_finish, f, tmp, dest)
+                failed = False
+            except BaseException:
+                await asyncio.to_thread(_discard, f, tmp)
+                raise
         finally:
-            event.set()
-            _generation_events.pop(cache_key, None)
+            _generations.pop(cache_key, None)
+            await generation.push(None, failed=failed)
 
     return StreamingResponse(_stream_and_save(), media_type='audio/wav')
 
 
-async def _file_chunks(path: Path):
-    with open(path, 'rb') as f:
-        while True:
-            chunk = f.read(4096)
-            if not chunk:
-                break
-            yield chunk
+def _open_tmp(tmp: Path) -> BinaryIO:
+    tmp.parent.mkdir(parents=True, exist_ok=True)
+    return open(tmp, 'w+b')
+
+
+def _finish(f: BinaryIO, tmp: Path, dest: Path) -> None:
+    _patch_wav_sizes(f)
+    f.close()
+    tmp.rename(dest)
+
+
+def _patch_wav_sizes(f: BinaryIO) -> None:
+    """Write the real RIFF and data sizes into a clip that was streamed with placeholder lengths.
+
+    The stored file is served with FileResponse, and browsers take duration and seeking from these fields.
+    """
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return
+    f.seek(4)
+    f.write(struct.pack('<I', size - 8))
+    pos = 12
+    while pos + 8 <= size:
+        f.seek(pos)
+        chunk_id, chunk_len = struct.unpack('<4sI', f.read(8))
+        if chunk_id == b'data':
+            f.seek(pos + 4)
+            f.write(struct.pack('<I', size - pos - 8))
+            return
+        pos += 8 + chunk_len + (chunk_len & 1)
+
+
+def _discard(f: BinaryIO, tmp: Path) -> None:
+    f.close()
+    tmp.unlink(missing_ok=True)
@@ -1,8 +1,15 @@
 import os
+from collections import OrderedDict
+
 from google import genai
 from google.genai import types
 
+# Recall queries and stored events repeat (the same player line is stored, then recalled against);
+# identical text always embeds to the same vector, so recent results are kept in-process
+EMBED_CACHE_SIZE = int(os.environ.get('EMBED_CACHE_SIZE', '1024'))
+
 _client: genai.Client | None = None
+_cache: OrderedDict[str, list[float]] = OrderedDict()
 
 
 def get_client() -> genai.Client:
@@ -13,10 +20,19 @@ def get_client() -> genai.Client:
 
 
 async def embed(text: str) -> list[float]:
+    vector = _cache.get(text)
+    if vector is not None:
+        _cache.move_to_end(text)
+        return vector
+
     client = get_client()
     response = await client.aio.models.embed_content(
         model='gemini-embedding-2',
         contents=text,
         config=types.EmbedContentConfig(output_dimensionality=1536),
     )
-    return response.embeddings[0].values
+    vector = response.embeddings[0].values
+    _cache[text] = vector
+    while len(_cache) > EMBED_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return vector
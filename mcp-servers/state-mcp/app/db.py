@@ -1,7 +1,14 @@
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from .config import settings
 
-engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+# orjson for the jsonb codec: campaign plans, memory and turn metadata round-trip on every call
+engine = create_async_engine(
+    settings.database_url,
+    pool_pre_ping=True,
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 
@@ -1,8 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from shared.middleware import CampaignIDMiddleware
 from .tools import campaign, character, npc, turns, memory
 
-app = FastAPI(title='state-mcp')
+# Turn histories and campaign context are the largest payloads between services; orjson encodes
+# them natively instead of through the stdlib json encoder
+app = FastAPI(title='state-mcp', default_response_class=ORJSONResponse)
 app.add_middleware(CampaignIDMiddleware)
 
 app.include_router(campaign.router)
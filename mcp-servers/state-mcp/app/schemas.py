@@ -16,6 +16,7 @@ class CreateCampaignOut(BaseModel):
 class SaveCampaignPlanIn(BaseModel):
     plan_json: dict[str, Any]
     visual_style: Optional[str] = None
+    phase: Optional[str] = None  # advanced in the same UPDATE, so the plan and the phase switch land together
 
 
 # save_character
@@ -113,11 +114,26 @@ class GetTurnsOut(BaseModel):
 
 
 # get_memory / update_memory
+class GetMemoryIn(BaseModel):
+    include_long_term: bool = True
+    long_term_version: Optional[str] = None  # the version the caller already holds; long_term is omitted if current
+
+
 class GetMemoryOut(BaseModel):
     short_term: list[str]
     long_term: str
+    long_term_version: str = ''
 
 
 class UpdateMemoryIn(BaseModel):
     short_term: list[str]
     long_term: str
+
+
+class AppendMemoryIn(BaseModel):
+    event: str
+
+
+class CompressMemoryIn(BaseModel):
+    long_term: str
+    folded: int  # number of oldest short-term events now summarised into long_term
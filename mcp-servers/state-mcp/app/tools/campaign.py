@@ -1,6 +1,6 @@
-import json
 from typing import Any
 
+import orjson
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -41,11 +41,14 @@ async def save_campaign_plan(
     db: AsyncSession = Depends(get_session),
 ) -> OkOut:
     campaign_id: str = request.state.campaign_id
-    params: dict[str, Any] = {'campaign_id': campaign_id, 'plan_json': json.dumps(body.plan_json)}
+    params: dict[str, Any] = {'campaign_id': campaign_id, 'plan_json': orjson.dumps(body.plan_json).decode()}
     query = 'UPDATE campaigns SET plan_json = CAST(:plan_json AS jsonb), updated_at = now()'
     if body.visual_style is not None:
         query += ', visual_style = :visual_style'
         params['visual_style'] = body.visual_style
+    if body.phase is not None:
+        query += ', phase = CAST(:phase AS campaign_phase)'
+        params['phase'] = body.phase
     query += ' WHERE id = :campaign_id'
     await db.execute(text(query), params)
     await db.commit()
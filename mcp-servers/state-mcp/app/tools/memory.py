@@ -1,5 +1,10 @@
-import json
+import asyncio
+import hashlib
+import os
+import weakref
+from collections import OrderedDict
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,26 +12,71 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..db import get_session
 from shared.schemas import OkOut
 
-from ..schemas import GetMemoryOut, UpdateMemoryIn
+from ..schemas import AppendMemoryIn, CompressMemoryIn, GetMemoryIn, GetMemoryOut, UpdateMemoryIn
 
 router = APIRouter()
 
+# state-mcp is the only writer of campaign memory, so each campaign's memory is read from the database
+# once and then kept here, updated alongside every write — the per-turn reads stop re-fetching a
+# long-term memory that grows for the whole campaign
+MEMORY_CACHE_SIZE = int(os.environ.get('MEMORY_CACHE_SIZE', '128'))
+
+_memory: OrderedDict[str, GetMemoryOut] = OrderedDict()
+# Per-campaign locks, so a cache fill can't interleave with a write and store a snapshot it already missed.
+# Held only while in use — a campaign nobody is reading or writing has no lock
+_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+
+def _lock(campaign_id: str) -> asyncio.Lock:
+    lock = _locks.get(campaign_id)
+    if lock is None:
+        lock = _locks[campaign_id] = asyncio.Lock()
+    return lock
+
+
+def _version(long_term: str) -> str:
+    return hashlib.blake2b(long_term.encode(), digest_size=8).hexdigest()
+
+
+def _remember(campaign_id: str, memory: GetMemoryOut) -> None:
+    _memory[campaign_id] = memory
+    _memory.move_to_end(campaign_id)
+    while len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
 
 @router.post('/tools/get_memory', response_model=GetMemoryOut)
 async def get_memory(
+    body: GetMemoryIn,
     request: Request,
     db: AsyncSession = Depends(get_session),
 ) -> GetMemoryOut:
     campaign_id: str = request.state.campaign_id
-    row = await db.execute(
-        text('SELECT short_term_memory, long_term_memory FROM campaigns WHERE id = :campaign_id'),
-        {'campaign_id': campaign_id},
+    async with _lock(campaign_id):
+        memory = _memory.get(campaign_id)
+        if memory is None:
+            row = await db.execute(
+                text('SELECT short_term_memory, long_term_memory FROM campaigns WHERE id = :campaign_id'),
+                {'campaign_id': campaign_id},
+            )
+            r = row.mappings().first()
+            if r is None:
+                raise HTTPException(status_code=404, detail='Campaign not found')
+            long_term = r['long_term_memory'] or ''
+            memory = GetMemoryOut(
+                short_term=r['short_term_memory'] or [], long_term=long_term, long_term_version=_version(long_term)
+            )
+            _remember(campaign_id, memory)
+        else:
+            _memory.move_to_end(campaign_id)
+    # A copy, since the cached list keeps changing with later appends. The large long-term field is left
+    # out for callers that only append, and for callers that already hold its current version
+    send_long_term = body.include_long_term and body.long_term_version != memory.long_term_version
+    return GetMemoryOut(
+        short_term=list(memory.short_term),
+        long_term=memory.long_term if send_long_term else '',
+        long_term_version=memory.long_term_version,
     )
-    r = row.mappings().first()
-    if r is None:
-        raise HTTPException(status_code=404, detail='Campaign not found')
-    stm = r['short_term_memory']
-    return GetMemoryOut(short_term=stm or [], long_term=r['long_term_memory'] or '')
 
 
 @router.post('/tools/update_memory', response_model=OkOut)
@@ -36,19 +86,87 @@ async def update_memory(
     db: AsyncSession = Depends(get_session),
 ) -> OkOut:
     campaign_id: str = request.state.campaign_id
-    await db.execute(
-        text("""
-            UPDATE campaigns SET
-                short_term_memory = CAST(:short_term AS jsonb),
-                long_term_memory = :long_term,
-                updated_at = now()
-            WHERE id = :campaign_id
-        """),
-        {
-            'campaign_id': campaign_id,
-            'short_term': json.dumps(body.short_term),
-            'long_term': body.long_term,
-        },
-    )
-    await db.commit()
+    async with _lock(campaign_id):
+        await db.execute(
+            text("""
+                UPDATE campaigns SET
+                    short_term_memory = CAST(:short_term AS jsonb),
+                    long_term_memory = :long_term,
+                    updated_at = now()
+                WHERE id = :campaign_id
+            """),
+            {
+                'campaign_id': campaign_id,
+                'short_term': orjson.dumps(body.short_term).decode(),
+                'long_term': body.long_term,
+            },
+        )
+        await db.commit()
+        _remember(
+            campaign_id,
+            GetMemoryOut(
+                short_term=list(body.short_term), long_term=body.long_term, long_term_version=_version(body.long_term)
+            ),
+        )
+    return OkOut()
+
+
+@router.post('/tools/append_memory', response_model=OkOut)
+async def append_memory(
+    body: AppendMemoryIn,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+) -> OkOut:
+    """Append one short-term event in place — the common per-turn write, without resending the whole memory."""
+    campaign_id: str = request.state.campaign_id
+    async with _lock(campaign_id):
+        await db.execute(
+            text("""
+                UPDATE campaigns SET
+                    short_term_memory = COALESCE(short_term_memory, '[]'::jsonb)
+                        || jsonb_build_array(CAST(:event AS text)),
+                    updated_at = now()
+                WHERE id = :campaign_id
+            """),
+            {'campaign_id': campaign_id, 'event': body.event},
+        )
+        await db.commit()
+        memory = _memory.get(campaign_id)
+        if memory is not None:
+            memory.short_term.append(body.event)
+    return OkOut()
+
+
+@router.post('/tools/compress_memory', response_model=OkOut)
+async def compress_memory(
+    body: CompressMemoryIn,
+    request: Request,
+    db: AsyncSession = Depends(get_session),
+) -> OkOut:
+    """Replace long-term memory and drop the folded events from the head of short-term memory.
+
+    Unlike update_memory, events appended after the caller read the memory are kept.
+    """
+    campaign_id: str = request.state.campaign_id
+    async with _lock(campaign_id):
+        await db.execute(
+            text("""
+                UPDATE campaigns SET
+                    short_term_memory = (
+                        SELECT COALESCE(jsonb_agg(e ORDER BY i), '[]'::jsonb)
+                        FROM jsonb_array_elements(short_term_memory) WITH ORDINALITY AS t(e, i)
+                        WHERE i > :folded
+                    ),
+                    long_term_memory = :long_term,
+                    updated_at = now()
+                WHERE id = :campaign_id
+            """),
+            {'campaign_id': campaign_id, 'long_term': body.long_term, 'folded': body.folded},
+        )
+        await db.commit()
+        memory = _memory.get(campaign_id)
+        if memory is not None:
+            del memory.short_term[: max(body.folded, 0)]
+            memory.long_term = body.long_term
+            memory.long_term_version = _version(body.long_term)
     return OkOut()
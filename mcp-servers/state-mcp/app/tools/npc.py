@@ -1,6 +1,6 @@
-import json
 from typing import Any
 
+import orjson
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -116,7 +116,7 @@ async def set_active_npc(
         {
             'campaign_id': campaign_id,
             'npc_id': body.npc_id,
-            'briefing': json.dumps(body.briefing),
+            'briefing': orjson.dumps(body.briefing).decode(),
             'conv_start_turn_id': body.conv_start_turn_id,
         },
     )
@@ -1,6 +1,6 @@
-import json
 from typing import Any
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -39,7 +39,7 @@ async def log_turn(
             'npc_name': body.npc_name,
             'audio_path': body.audio_path,
             'image_path': body.image_path,
-            'metadata': json.dumps(metadata),
+            'metadata': orjson.dumps(metadata).decode(),
         },
     )
     turn_id = str(row.scalar_one())
@@ -73,29 +73,22 @@ async def get_turns(
         where_clauses.append('session_phase = :phase_filter')
         params['phase_filter'] = body.phase_filter
 
-    order = 'DESC'
-    reverse_result = True
-
     if body.since_turn_id:
         where_clauses.append('created_at > (SELECT created_at FROM turns WHERE id = :since_turn_id)')
         params['since_turn_id'] = body.since_turn_id
-        order = 'ASC'
-        reverse_result = False
 
     if body.before_turn_id:
         where_clauses.append('created_at < (SELECT created_at FROM turns WHERE id = :before_turn_id)')
         params['before_turn_id'] = body.before_turn_id
-        order = 'DESC'
-        reverse_result = True
 
+    # Always the newest `limit` matching turns — a conversation longer than the limit keeps its latest
+    # lines, not its first ones — fetched newest-first and flipped in place into chronological order
     where_sql = ' AND '.join(where_clauses)
-    query = f'SELECT * FROM turns WHERE {where_sql} ORDER BY created_at {order} LIMIT :limit'
+    query = f'SELECT * FROM turns WHERE {where_sql} ORDER BY created_at DESC LIMIT :limit'
 
     rows = await db.execute(text(query), params)
     turns = [_turn_row(r) for r in rows.mappings()]
-
-    if reverse_result:
-        turns = list(reversed(turns))
+    turns.reverse()
 
     return GetTurnsOut(turns=turns)
 
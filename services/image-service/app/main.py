@@ -1,18 +1,35 @@
+import asyncio
 import base64
 import hashlib
+import logging
 import os
 from typing import Optional
 
 import redis.asyncio as aioredis
 from fastapi import FastAPI
+from fastapi.responses import Response
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title='image-service')
 
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
 CACHE_TTL = 3600
+# Read once at import — the provider can't change without a restart, so the hot path never re-reads env
+IMAGE_PROVIDER = os.environ.get('IMAGE_PROVIDER', 'gemini')
+GEMINI_IMAGE_MODEL = os.environ.get('GEMINI_IMAGE_MODEL', 'gemini-2.5-flash-image')
+_CACHE_MODEL = GEMINI_IMAGE_MODEL if IMAGE_PROVIDER == 'gemini' else IMAGE_PROVIDER
+
+# Per-type request parameters, keyed by GenerateRequest.type (anything else is treated as a scene)
+_GEMINI_ASPECT_HINT = {'portrait': ' -- square portrait format', 'scene': ' -- wide landscape 16:9 format'}
+_DALLE_SIZE = {'portrait': '1024x1024', 'scene': '1792x1024'}
 
 _redis: aioredis.Redis | None = None
+_gemini_client = None
+_openai_client = None
+# Per-key in-flight generations, so concurrent identical requests share one provider call
+_inflight: dict[str, asyncio.Future[bytes]] = {}
 
 
 def get_redis() -> aioredis.Redis:
@@ -22,6 +39,27 @@ def get_redis() -> aioredis.Redis:
     return _redis
 
 
+def get_gemini_client():
+    # Built once and then shared — constructing a client per request paid for a new connection pool and
+    # TLS handshake on every image. The startup hook builds it on a worker thread; this lazy path only
+    # runs if that warm-up failed
+    global _gemini_client
+    if _gemini_client is None:
+        from google import genai
+
+        _gemini_client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
+    return _gemini_client
+
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+
+        _openai_client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
+    return _openai_client
+
+
 class GenerateRequest(BaseModel):
     prompt: str
     style: str = ''
@@ -36,16 +74,18 @@ class GenerateResponse(BaseModel):
     cached: bool
 
 
-async def _generate_gemini(prompt: str, img_type: str) -> bytes:
-    from google import genai
+def _cache_key(req: GenerateRequest) -> str:
+    # Canonical, unambiguous key: NUL-separated fields (a ':' in the prompt can't shift the type),
+    # plus provider and model so switching backends never serves another model's image
+    raw = '\0'.join((IMAGE_PROVIDER, _CACHE_MODEL, req.type, req.prompt))
+    return 'img:' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
 
-    client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
-    model = os.environ.get('GEMINI_IMAGE_MODEL', 'gemini-2.5-flash-image')
-    aspect_hint = 'square portrait format' if img_type == 'portrait' else 'wide landscape 16:9 format'
-    full_prompt = f'{prompt} -- {aspect_hint}'
+
+async def _generate_gemini(prompt: str, img_type: str) -> bytes:
+    client = get_gemini_client()
     response = await client.aio.models.generate_content(
-        model=model,
-        contents=full_prompt,
+        model=GEMINI_IMAGE_MODEL,
+        contents=prompt + _GEMINI_ASPECT_HINT.get(img_type, _GEMINI_ASPECT_HINT['scene']),
     )
     for part in response.parts:
         if part.inline_data is not None:
@@ -54,40 +94,74 @@ async def _generate_gemini(prompt: str, img_type: str) -> bytes:
 
 
 async def _generate_dalle(prompt: str, img_type: str) -> bytes:
-    from openai import AsyncOpenAI
-
-    client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
-    size = '1024x1024' if img_type == 'portrait' else '1792x1024'
+    client = get_openai_client()
+    size = _DALLE_SIZE.get(img_type, _DALLE_SIZE['scene'])
     response = await client.images.generate(model='dall-e-3', prompt=prompt, size=size, response_format='b64_json')
     return base64.b64decode(response.data[0].b64_json)
 
 
-@app.post('/generate', response_model=GenerateResponse)
-async def generate(req: GenerateRequest) -> GenerateResponse:
+async def _get_image(req: GenerateRequest) -> tuple[bytes, bool]:
+    """Returns (image_bytes, cached)."""
     cache_key = None
     if req.cache:
-        raw = f'{req.prompt}:{req.type}'
-        cache_key = f'img:{hashlib.sha256(raw.encode()).hexdigest()}'
+        cache_key = _cache_key(req)
         cached = await get_redis().get(cache_key)
         if cached:
-            return GenerateResponse(image_bytes=base64.b64encode(cached).decode(), cached=True)
-
-    provider = os.environ.get('IMAGE_PROVIDER', 'gemini')
-    if provider == 'dalle':
-        image_bytes = await _generate_dalle(req.prompt, req.type)
-    else:
-        image_bytes = await _generate_gemini(req.prompt, req.type)
+            return cached, True
+        if cache_key in _inflight:
+            return await asyncio.shield(_inflight[cache_key]), True
 
+    future: asyncio.Future[bytes] = asyncio.get_event_loop().create_future()
     if cache_key:
-        await get_redis().setex(cache_key, CACHE_TTL, image_bytes)
+        _inflight[cache_key] = future
+    try:
+        if IMAGE_PROVIDER == 'dalle':
+            image_bytes = await _generate_dalle(req.prompt, req.type)
+        else:
+            image_bytes = await _generate_gemini(req.prompt, req.type)
+        if cache_key:
+            await get_redis().setex(cache_key, CACHE_TTL, image_bytes)
+        future.set_result(image_bytes)
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved — there may be no other waiter to observe it
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        if cache_key:
+            _inflight.pop(cache_key, None)
+    return image_bytes, False
+
+
+@app.post('/generate', response_model=GenerateResponse)
+async def generate(req: GenerateRequest) -> GenerateResponse:
+    image_bytes, cached = await _get_image(req)
+    return GenerateResponse(image_bytes=base64.b64encode(image_bytes).decode(), cached=cached)
+
+
+@app.post('/generate/raw')
+async def generate_raw(req: GenerateRequest) -> Response:
+    """Same as /generate, but the image is the response body — no base64 inflation or JSON re-parse."""
+    image_bytes, cached = await _get_image(req)
+    return Response(content=image_bytes, media_type='image/jpeg', headers={'X-Cached': str(cached).lower()})
+
 
-    return GenerateResponse(image_bytes=base64.b64encode(image_bytes).decode(), cached=False)
+@app.on_event('startup')
+async def startup() -> None:
+    # Paid here, side by side, rather than one after the other by the first scene: importing the provider
+    # SDK and building its client on a worker thread, and the first Redis connection
+    get_client = get_openai_client if IMAGE_PROVIDER == 'dalle' else get_gemini_client
+    results = await asyncio.gather(asyncio.to_thread(get_client), get_redis().ping(), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning('Warm-up failed (non-critical)', exc_info=result)
 
 
 @app.get('/health')
 async def health() -> dict:
     return {
         'ok': True,
-        'provider': os.environ.get('IMAGE_PROVIDER', 'gemini'),
-        'model': os.environ.get('GEMINI_IMAGE_MODEL', 'gemini-2.5-flash-image'),
+        'provider': IMAGE_PROVIDER,
+        'model': GEMINI_IMAGE_MODEL,
     }
@@ -1,10 +1,15 @@
+import asyncio
+import contextlib
 import hashlib
-import json
 import os
+import time
+from collections import OrderedDict
 from typing import Optional
 
+import orjson
 import redis.asyncio as aioredis
-from fastapi import FastAPI
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy import text
@@ -33,11 +38,19 @@ if _langfuse_enabled():
 
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
 DATABASE_URL = os.environ.get('DATABASE_URL', '')
-CACHE_TTL = 3600
+CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', '3600'))
+# Upper bound on in-flight provider calls; agents fan out several generations per turn
+LLM_CONCURRENCY = int(os.environ.get('LLM_CONCURRENCY', '8'))
+# In-process LRU in front of Redis: hot entries skip the network round-trip and JSON re-parse
+L1_CACHE_SIZE = int(os.environ.get('LLM_L1_CACHE_SIZE', '256'))
 
 _redis: aioredis.Redis | None = None
 _db_engine = None
 _db_session = None
+_llm_semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+_l1_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()  # key -> (expires_at, response fields)
+# Per-key in-flight generations, so identical requests arriving together share one provider call
+_inflight: dict[str, asyncio.Future[dict]] = {}
 
 
 def get_redis() -> aioredis.Redis:
@@ -47,6 +60,25 @@ def get_redis() -> aioredis.Redis:
     return _redis
 
 
+def _l1_get(key: str) -> dict | None:
+    entry = _l1_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, data = entry
+    if expires_at < time.monotonic():
+        del _l1_cache[key]
+        return None
+    _l1_cache.move_to_end(key)
+    return data
+
+
+def _l1_put(key: str, data: dict) -> None:
+    _l1_cache[key] = (time.monotonic() + CACHE_TTL, data)
+    _l1_cache.move_to_end(key)
+    while len(_l1_cache) > L1_CACHE_SIZE:
+        _l1_cache.popitem(last=False)
+
+
 def get_db_session() -> async_sessionmaker | None:
     global _db_engine, _db_session
     if _db_session is None and DATABASE_URL:
@@ -71,47 +103,192 @@ class GenerateResponse(BaseModel):
 
 
 @app.post('/generate', response_model=GenerateResponse)
-async def generate(req: GenerateRequest) -> GenerateResponse:
-    provider = get_provider()
+async def generate(req: GenerateRequest, background_tasks: BackgroundTasks) -> GenerateResponse:
     cache_key = None
     if req.cache:
-        raw = json.dumps(req.messages, sort_keys=True) + (req.response_format or 'text')
-        if req.response_json_schema:
-            raw += json.dumps(req.response_json_schema, sort_keys=True)
-        cache_key = f'llm:{hashlib.sha256(raw.encode()).hexdigest()}'
-        cached = await get_redis().get(cache_key)
-        if cached:
-            data = json.loads(cached)
+        cache_key = _cache_key(req)
+        data = await _cached(cache_key)
+        if data is None and cache_key in _inflight:
+            data = await asyncio.shield(_inflight[cache_key])
+        if data is not None:
+            background_tasks.add_task(_log_usage, req.user_id, data['tokens_in'], data['tokens_out'], cached=True)
             return GenerateResponse(cached=True, **data)
 
-    if _langfuse is not None:
-        model_name = os.environ.get('GEMINI_MODEL', os.environ.get('OPENAI_MODEL', os.environ.get('ANTHROPIC_MODEL', 'unknown')))
-        with _langfuse.start_as_current_observation(
-            as_type='generation',
-            name='llm-generate',
-            model=model_name,
-            input=req.messages,
-            metadata={'response_format': req.response_format, 'user_id': req.user_id},
-        ) as generation:
-            text_out, tokens_in, tokens_out = await provider.generate(
-                req.messages, req.response_format or 'text', req.response_json_schema
-            )
-            generation.update(
-                output=text_out,
-                usage={'input': tokens_in, 'output': tokens_out, 'unit': 'TOKENS'},
-            )
-    else:
-        text_out, tokens_in, tokens_out = await provider.generate(
-            req.messages, req.response_format or 'text', req.response_json_schema
-        )
+    future: asyncio.Future[dict] = asyncio.get_event_loop().create_future()
+    if cache_key:
+        _inflight[cache_key] = future
+    try:
+        text_out, tokens_in, tokens_out = await _traced_generate(req)
+        data = {'text': text_out, 'tokens_in': tokens_in, 'tokens_out': tokens_out}
+        future.set_result(data)
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved — there may be no other waiter to observe it
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        if cache_key:
+            _inflight.pop(cache_key, None)
+
+    # Persistence runs after the response is sent — the caller never waits on Redis or Postgres.
+    # A JSON request whose answer doesn't parse is not cached, so a retry of the same prompt gets
+    # a fresh generation instead of replaying the broken one for the rest of the TTL.
+    if cache_key and _cacheable(req, text_out):
+        _l1_put(cache_key, data)
+        background_tasks.add_task(_store_cached, cache_key, data)
+    background_tasks.add_task(_log_usage, req.user_id, tokens_in, tokens_out, cached=False)
+
+    return GenerateResponse(text=text_out, tokens_in=tokens_in, tokens_out=tokens_out, cached=False)
+
+
+@app.post('/generate/stream')
+async def generate_stream(req: GenerateRequest, background_tasks: BackgroundTasks) -> StreamingResponse:
+    """Same request as /generate, answered as plain text sent while the provider produces it.
 
+    A cached answer, or one another request is already generating, is sent in one piece. Caching, tracing
+    and usage logging happen once the stream has ended.
+    """
+    cache_key = _cache_key(req) if req.cache else None
+    data = await _cached(cache_key) if cache_key else None
+    if data is None and cache_key in _inflight:
+        data = await asyncio.shield(_inflight[cache_key])
+    if data is not None:
+        background_tasks.add_task(_log_usage, req.user_id, data['tokens_in'], data['tokens_out'], cached=True)
+        return StreamingResponse(iter([data['text']]), media_type='text/plain; charset=utf-8')
+    return StreamingResponse(_stream_generate(req, cache_key), media_type='text/plain; charset=utf-8')
+
+
+async def _stream_generate(req: GenerateRequest, cache_key: str | None):
+    # Registered once the body starts, with no await before it: a client that disconnects first never starts
+    # this generator, and an entry made earlier would never be cleaned up. Identical requests arriving while
+    # this one streams (here or on /generate) wait for its answer instead of making their own provider call
+    if cache_key and cache_key in _inflight:
+        data = await asyncio.shield(_inflight[cache_key])
+        yield data['text']
+        await _log_usage(req.user_id, data['tokens_in'], data['tokens_out'], cached=True)
+        return
+    future: asyncio.Future[dict] = asyncio.get_event_loop().create_future()
     if cache_key:
-        payload = json.dumps({'text': text_out, 'tokens_in': tokens_in, 'tokens_out': tokens_out})
-        await get_redis().setex(cache_key, CACHE_TTL, payload)
+        _inflight[cache_key] = future
+    parts: list[str] = []
+    tokens_in = tokens_out = 0
+    try:
+        with _observation(req) as generation:
+            async with _llm_semaphore:
+                chunks = get_provider().stream(req.messages, req.response_format or 'text', req.response_json_schema)
+                async for delta, chunk_in, chunk_out in chunks:
+                    # Providers report usage on the last chunk (Gemini on every one, growing); keep the largest
+                    tokens_in, tokens_out = max(tokens_in, chunk_in), max(tokens_out, chunk_out)
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            text_out = ''.join(parts)
+            if generation is not None:
+                generation.update(
+                    output=text_out,
+                    usage={'input': tokens_in, 'output': tokens_out, 'unit': 'TOKENS'},
+                )
+        data = {'text': text_out, 'tokens_in': tokens_in, 'tokens_out': tokens_out}
+        future.set_result(data)
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved — there may be no other waiter to observe it
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        if cache_key:
+            _inflight.pop(cache_key, None)
 
+    if cache_key and _cacheable(req, text_out):
+        _l1_put(cache_key, data)
+        await _store_cached(cache_key, data)
     await _log_usage(req.user_id, tokens_in, tokens_out, cached=False)
 
-    return GenerateResponse(text=text_out, tokens_in=tokens_in, tokens_out=tokens_out, cached=False)
+
+async def _cached(cache_key: str) -> dict | None:
+    data = _l1_get(cache_key)
+    if data is None:
+        cached = await get_redis().get(cache_key)
+        if cached:
+            data = orjson.loads(cached)
+            _l1_put(cache_key, data)
+    return data
+
+
+def _observation(req: GenerateRequest):
+    """The Langfuse generation a provider call is traced under; yields None when tracing is off."""
+    if _langfuse is None:
+        return contextlib.nullcontext()
+    model_name = os.environ.get(
+        'GEMINI_MODEL', os.environ.get('OPENAI_MODEL', os.environ.get('ANTHROPIC_MODEL', 'unknown'))
+    )
+    return _langfuse.start_as_current_observation(
+        as_type='generation',
+        name='llm-generate',
+        model=model_name,
+        input=req.messages,
+        metadata={'response_format': req.response_format, 'user_id': req.user_id},
+    )
+
+
+async def _traced_generate(req: GenerateRequest) -> tuple[str, int, int]:
+    if _langfuse is None:
+        return await _provider_generate(req)
+    with _observation(req) as generation:
+        text_out, tokens_in, tokens_out = await _provider_generate(req)
+        generation.update(
+            output=text_out,
+            usage={'input': tokens_in, 'output': tokens_out, 'unit': 'TOKENS'},
+        )
+    return text_out, tokens_in, tokens_out
+
+
+def _cache_key(req: GenerateRequest) -> str:
+    # Content-addressed: same model + same messages + same output contract -> same answer.
+    # The model is part of the key so switching LLM_PROVIDER/*_MODEL never serves stale text.
+    # Only the fields providers actually consume (role, content) are fed to the hash, streamed
+    # in one field at a time instead of serialising the whole message list into one big string.
+    # Surrounding whitespace is ignored and empty messages skipped, so near-identical prompts
+    # (a trailing newline on a player line, an empty context block) still hit.
+    provider = get_provider()
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{type(provider).__name__}\0{provider.model}\0{req.response_format or "text"}\0'.encode())
+    for m in req.messages:
+        content = m['content'].strip()
+        if not content:
+            continue
+        h.update(m['role'].encode())
+        h.update(b'\0')
+        h.update(content.encode())
+        h.update(b'\0')
+    if req.response_json_schema:
+        h.update(orjson.dumps(req.response_json_schema, option=orjson.OPT_SORT_KEYS))
+    return f'llm:{h.hexdigest()}'
+
+
+def _cacheable(req: GenerateRequest, text_out: str) -> bool:
+    if req.response_format != 'json' and not req.response_json_schema:
+        return True
+    try:
+        orjson.loads(text_out)
+    except orjson.JSONDecodeError:
+        return False
+    return True
+
+
+async def _provider_generate(req: GenerateRequest) -> tuple[str, int, int]:
+    async with _llm_semaphore:
+        return await get_provider().generate(req.messages, req.response_format or 'text', req.response_json_schema)
+
+
+async def _store_cached(cache_key: str, data: dict) -> None:
+    try:
+        # Compact bytes straight from orjson: no whitespace and no intermediate str
+        await get_redis().setex(cache_key, CACHE_TTL, orjson.dumps(data))
+    except Exception:
+        logger.warning('LLM cache write failed (non-critical)', exc_info=True)
 
 
 async def _log_usage(user_id: Optional[str], tokens_in: int, tokens_out: int, cached: bool) -> None:
@@ -141,6 +318,16 @@ async def _log_usage(user_id: Optional[str], tokens_in: int, tokens_out: int, ca
         logger.warning('Usage logging failed (non-critical)', exc_info=True)
 
 
+@app.on_event('startup')
+async def startup() -> None:
+    # Paid here, side by side, rather than one after the other by the first turn: importing the provider
+    # SDK and building its client on a worker thread, and the first Redis connection
+    results = await asyncio.gather(asyncio.to_thread(get_provider), get_redis().ping(), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning('Warm-up failed (non-critical)', exc_info=result)
+
+
 @app.get('/health')
 async def health() -> dict:
     return {
@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import abc
-import json
+import hashlib
 import os
-from typing import Any
+from typing import Any, AsyncIterator
+
+import orjson
 
 
 class LLMProvider(abc.ABC):
+    model: str
+
     @abc.abstractmethod
     async def generate(
         self,
@@ -18,6 +22,16 @@ class LLMProvider(abc.ABC):
     ) -> tuple[str, int, int]:
         """Returns (text, tokens_in, tokens_out)."""
 
+    async def stream(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> AsyncIterator[tuple[str, int, int]]:
+        """Yields (text_delta, tokens_in, tokens_out) as the text is generated; token counts may stay 0 until the
+        last item. Providers without a streaming adapter yield their whole answer at once."""
+        yield await self.generate(messages, response_format, response_json_schema)
+
 
 # ─── Gemini ──────────────────────────────────────────────────────
 
@@ -29,17 +43,10 @@ class GeminiProvider(LLMProvider):
         self.client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
         self.model = os.environ.get('GEMINI_MODEL', 'gemini-3.1-flash-lite-preview')
 
-    async def generate(
-        self,
-        messages: list[dict],
-        response_format: str,
-        response_json_schema: dict | None = None,
-    ) -> tuple[str, int, int]:
+    def _config(self, messages: list[dict], response_format: str, response_json_schema: dict | None) -> Any:
         from google.genai import types
 
         system_parts = [m['content'] for m in messages if m['role'] == 'system']
-        contents = _gemini_contents(messages)
-
         config_kwargs: dict[str, Any] = {
             'system_instruction': '\n\n'.join(system_parts) if system_parts else None,
         }
@@ -50,16 +57,40 @@ class GeminiProvider(LLMProvider):
             config_kwargs['response_mime_type'] = 'application/json'
         else:
             config_kwargs['response_mime_type'] = 'text/plain'
+        return types.GenerateContentConfig(**config_kwargs)
 
+    async def generate(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> tuple[str, int, int]:
         response = await self.client.aio.models.generate_content(
             model=self.model,
-            contents=contents,
-            config=types.GenerateContentConfig(**config_kwargs),
+            contents=_gemini_contents(messages),
+            config=self._config(messages, response_format, response_json_schema),
         )
         text = response.text or ''
         usage = response.usage_metadata
         return text, (usage.prompt_token_count or 0), (usage.candidates_token_count or 0)
 
+    async def stream(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> AsyncIterator[tuple[str, int, int]]:
+        chunks = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=_gemini_contents(messages),
+            config=self._config(messages, response_format, response_json_schema),
+        )
+        async for chunk in chunks:
+            usage = chunk.usage_metadata
+            tokens_in = (usage.prompt_token_count or 0) if usage else 0
+            tokens_out = (usage.candidates_token_count or 0) if usage else 0
+            yield chunk.text or '', tokens_in, tokens_out
+
 
 def _gemini_contents(messages: list[dict]) -> list[Any]:
     from google.genai import types
@@ -85,12 +116,7 @@ class OpenAIProvider(LLMProvider):
         self.client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
         self.model = os.environ.get('OPENAI_MODEL', 'gpt-4o')
 
-    async def generate(
-        self,
-        messages: list[dict],
-        response_format: str,
-        response_json_schema: dict | None = None,
-    ) -> tuple[str, int, int]:
+    def _kwargs(self, messages: list[dict], response_format: str, response_json_schema: dict | None) -> dict:
         kwargs: dict = {}
         if response_json_schema:
             # Structured outputs with schema — strict=False avoids $defs/$ref constraints
@@ -105,15 +131,47 @@ class OpenAIProvider(LLMProvider):
         elif response_format == 'json':
             kwargs['response_format'] = {'type': 'json_object'}
 
+        # OpenAI caches prompt prefixes automatically, but only on the server the request lands on.
+        # Keying requests by their session-stable first system message routes every turn of a
+        # campaign to the same cache. Sent as a raw body field so older SDKs pass it through as well
+        if messages and messages[0]['role'] == 'system':
+            static = messages[0]['content'].encode()
+            kwargs['extra_body'] = {'prompt_cache_key': hashlib.blake2b(static, digest_size=16).hexdigest()}
+        return kwargs
+
+    async def generate(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> tuple[str, int, int]:
         response = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
-            **kwargs,
+            **self._kwargs(messages, response_format, response_json_schema),
         )
         text = response.choices[0].message.content or ''
         usage = response.usage
         return text, (usage.prompt_tokens if usage else 0), (usage.completion_tokens if usage else 0)
 
+    async def stream(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> AsyncIterator[tuple[str, int, int]]:
+        chunks = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+            stream_options={'include_usage': True},  # usage arrives in a final chunk without choices
+            **self._kwargs(messages, response_format, response_json_schema),
+        )
+        async for chunk in chunks:
+            text = (chunk.choices[0].delta.content or '') if chunk.choices else ''
+            usage = chunk.usage
+            yield text, (usage.prompt_tokens if usage else 0), (usage.completion_tokens if usage else 0)
+
 
 # ─── Anthropic ───────────────────────────────────────────────────
 
@@ -125,38 +183,70 @@ class AnthropicProvider(LLMProvider):
         self.client = anthropic.AsyncAnthropic(api_key=os.environ['ANTHROPIC_API_KEY'])
         self.model = os.environ.get('ANTHROPIC_MODEL', 'claude-sonnet-4-6')
 
-    async def generate(
-        self,
-        messages: list[dict],
-        response_format: str,
-        response_json_schema: dict | None = None,
-    ) -> tuple[str, int, int]:
-        system_parts = [m['content'] for m in messages if m['role'] == 'system']
+    def _kwargs(self, messages: list[dict], response_format: str, response_json_schema: dict | None) -> dict:
+        system_parts = [m['content'] for m in messages if m['role'] == 'system' and m['content'].strip()]
         user_messages = [dict(m) for m in messages if m['role'] != 'system']
-        system = '\n\n'.join(system_parts) if system_parts else ''
+
+        # Agents put the session-stable instructions in the first system message and per-turn
+        # context after it. The stable part (plus the schema, which is fixed per call site) is
+        # sent as its own block marked for prompt caching; the per-turn blocks follow uncached.
+        static = system_parts[:1]
+        dynamic = system_parts[1:]
 
         # Anthropic has no native schema enforcement — inject into system prompt
         if response_json_schema:
-            schema_instruction = 'Respond with valid JSON matching this exact schema:\n' + json.dumps(
-                response_json_schema, indent=2
-            )
-            system = (system + '\n\n' + schema_instruction).strip()
+            schema_text = orjson.dumps(response_json_schema, option=orjson.OPT_INDENT_2).decode()
+            static.append('Respond with valid JSON matching this exact schema:\n' + schema_text)
         elif response_format == 'json':
-            system = (system + '\n\nRespond with valid JSON only.').strip()
-
-        kwargs: dict = {}
+            dynamic.append('Respond with valid JSON only.')
+
+        kwargs: dict = {'model': self.model, 'max_tokens': 8096}
+        system: list[dict] = []
+        if static:
+            system.append({'type': 'text', 'text': '\n\n'.join(static), 'cache_control': {'type': 'ephemeral'}})
+        if dynamic:
+            system.append({'type': 'text', 'text': '\n\n'.join(dynamic)})
         if system:
             kwargs['system'] = system
 
-        response = await self.client.messages.create(
-            model=self.model,
-            max_tokens=8096,
-            messages=user_messages,
-            **kwargs,
-        )
+        # With nothing per-turn ahead of it, the conversation itself is a growing stable prefix
+        # (the designer/creator interviews): a second breakpoint on the newest message lets the next
+        # turn read the whole transcript so far from cache instead of re-processing it
+        if not dynamic and len(user_messages) > 1 and isinstance(user_messages[-1]['content'], str):
+            last = user_messages[-1]
+            last['content'] = [{'type': 'text', 'text': last['content'], 'cache_control': {'type': 'ephemeral'}}]
+        kwargs['messages'] = user_messages
+        return kwargs
+
+    async def generate(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> tuple[str, int, int]:
+        response = await self.client.messages.create(**self._kwargs(messages, response_format, response_json_schema))
         text = response.content[0].text if response.content else ''
-        usage = response.usage
-        return text, (usage.input_tokens if usage else 0), (usage.output_tokens if usage else 0)
+        return (text, *_anthropic_usage(response.usage))
+
+    async def stream(
+        self,
+        messages: list[dict],
+        response_format: str,
+        response_json_schema: dict | None = None,
+    ) -> AsyncIterator[tuple[str, int, int]]:
+        async with self.client.messages.stream(**self._kwargs(messages, response_format, response_json_schema)) as s:
+            async for text in s.text_stream:
+                yield text, 0, 0
+            final = await s.get_final_message()
+        yield ('', *_anthropic_usage(final.usage))
+
+
+def _anthropic_usage(usage: Any) -> tuple[int, int]:
+    if usage is None:
+        return 0, 0
+    # input_tokens excludes cache reads/writes; report the full prompt size like the other providers
+    cached_in = (usage.cache_read_input_tokens or 0) + (usage.cache_creation_input_tokens or 0)
+    return usage.input_tokens + cached_in, usage.output_tokens
 
 
 # ─── Factory ─────────────────────────────────────────────────────
@@ -1,19 +1,143 @@
 import asyncio
 import base64
+import collections
+import functools
+import logging
 import os
-import tempfile
+import struct
+from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title='stt-service')
 
-STT_PROVIDER = os.environ.get('STT_PROVIDER', 'whisper_local')
+STT_PROVIDER = os.environ.get('STT_PROVIDER', 'faster_whisper')
 WHISPER_MODEL_SIZE = os.environ.get('WHISPER_MODEL', 'small')
+WHISPER_DEVICE = os.environ.get('WHISPER_DEVICE') or None  # None = CUDA if available, else CPU
+WHISPER_COMPILE = os.environ.get('WHISPER_COMPILE', '0') == '1'
+SAMPLE_RATE = 16000  # Whisper's native input rate
+WINDOW_SAMPLES = 30 * SAMPLE_RATE  # Whisper's fixed 30 s context window
+STT_MAX_BATCH = int(os.environ.get('STT_MAX_BATCH', '8'))
+# faster_whisper (CTranslate2) weight precision — int8 runs on both CPU and CUDA at ~1/4 the memory.
+# 'auto' picks int8_float16 on CUDA (int8 weights, fp16 activations on the tensor cores) and int8 on the CPU.
+# int8 (and auto) also dynamically quantizes openai-whisper's Linear layers when it runs on the CPU.
+WHISPER_COMPUTE_TYPE = os.environ.get('WHISPER_COMPUTE_TYPE', 'auto')
+# Greedy decoding by default: beam search multiplies decoder work for little gain on short commands
+WHISPER_BEAM_SIZE = int(os.environ.get('WHISPER_BEAM_SIZE', '1'))
+# A fixed language skips the per-clip language-detection pass over the first window
+WHISPER_LANGUAGE = os.environ.get('WHISPER_LANGUAGE') or None
+# Concurrent faster_whisper transcriptions (CTranslate2 num_workers): one request's CPU-side feature
+# extraction and segment loop overlap another's decode on the device
+WHISPER_NUM_WORKERS = int(os.environ.get('WHISPER_NUM_WORKERS', '1'))
+# Silero VAD in front of faster_whisper: leading/trailing silence and long pauses are cut before decoding,
+# so a short command costs its speech, not the whole recording (a clip with no speech decodes nothing)
+WHISPER_VAD = os.environ.get('WHISPER_VAD', '1') == '1'
+WHISPER_VAD_MIN_SILENCE_MS = int(os.environ.get('WHISPER_VAD_MIN_SILENCE_MS', '500'))
 
 _model = None
 _model_loaded = False
+_openai_client = None
 _model_lock = asyncio.Lock()
+# One inference thread for openai-whisper, whose model is not safe to share between concurrent calls;
+# faster_whisper gets one per CTranslate2 worker. Dedicated threads keep transcription off the event
+# loop and the default pool.
+_executor = ThreadPoolExecutor(
+    max_workers=WHISPER_NUM_WORKERS if STT_PROVIDER == 'faster_whisper' else 1, thread_name_prefix='whisper'
+)
+# Pending (clip, future) pairs; a plain deque + wake-up event, drained a whole batch at a time
+_pending: collections.deque[tuple[np.ndarray, asyncio.Future[str]]] = collections.deque()
+_pending_ready = asyncio.Event()
+_batch_task: asyncio.Task | None = None
+_mel_buffer = None  # (STT_MAX_BATCH, n_mels, frames) CPU tensor, reused across batches
+_audio_buffer = None  # (STT_MAX_BATCH, samples) pinned host tensor feeding the GPU mel front end
+
+
+def get_openai_client():
+    # Imported and built on first use, once per process: local-model deployments never load the
+    # OpenAI SDK, and API deployments reuse one connection pool instead of a client per request
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+
+        _openai_client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
+    return _openai_client
+
+
+@functools.lru_cache(maxsize=2)
+def _whisper_model(name: str, device: str | None):
+    """Load each (size, device) pair once per process; every caller shares the same weights."""
+    import torch
+    import whisper
+
+    # Leave one core to the event loop, so uploads, ffmpeg pipes and health checks stay responsive
+    # while a clip is being decoded on the CPU
+    torch.set_num_threads(max(1, (os.cpu_count() or 2) - 1))
+    model = whisper.load_model(name, device=device)
+    if model.device.type == 'cpu' and (WHISPER_COMPUTE_TYPE == 'auto' or WHISPER_COMPUTE_TYPE.startswith('int8')):
+        # CPU decoding is bound by streaming the Linear weights; int8 dynamic quantization cuts that
+        # traffic ~4x, matching what faster_whisper does with the same setting.
+        # openai-whisper's layers are whisper.model.Linear, whose only change is casting the weights to the
+        # input dtype (a no-op in fp32). quantize_dynamic matches modules by exact type and from_float rejects
+        # subclasses, so they are turned back into plain nn.Linear first
+        for module in model.modules():
+            if type(module) is whisper.model.Linear:
+                module.__class__ = torch.nn.Linear
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        quantized = sum(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules())
+        if quantized:
+            logger.info('Quantized %d Linear layers of whisper %s to int8', quantized, name)
+        else:
+            logger.warning('int8 quantization found no Linear layers in whisper %s; running in fp32', name)
+        # Denormals from near-zero attention weights take the slow path on x86
+        torch.set_flush_denormal(True)
+    if WHISPER_COMPILE:
+        # The encoder always sees a fixed 30 s mel window, so it compiles to one graph. Trace it
+        # here so compilation is paid while the service is still reporting model_loaded=false,
+        # not on the first player's request.
+        model.encoder = torch.compile(model.encoder)
+        dtype = torch.float16 if model.device.type == 'cuda' else torch.float32
+        with torch.inference_mode():
+            model.embed_audio(
+                torch.zeros((1, model.dims.n_mels, whisper.audio.N_FRAMES), dtype=dtype, device=model.device)
+            )
+    return model
+
+
+@functools.lru_cache(maxsize=2)
+def _faster_whisper_model(name: str, device: str | None):
+    from faster_whisper import WhisperModel
+
+    # CTranslate2 defaults to 4 CPU threads whatever the machine; like openai-whisper above, use every core
+    # but one, split across the concurrent workers (ignored when running on CUDA)
+    cpu_threads = max(1, ((os.cpu_count() or 2) - 1) // WHISPER_NUM_WORKERS)
+    return WhisperModel(
+        name,
+        device=device or 'auto',
+        compute_type=_faster_whisper_compute_type(device),
+        cpu_threads=cpu_threads,
+        num_workers=WHISPER_NUM_WORKERS,
+    )
+
+
+def _faster_whisper_compute_type(device: str | None) -> str:
+    if WHISPER_COMPUTE_TYPE != 'auto':
+        return WHISPER_COMPUTE_TYPE
+    import ctranslate2
+
+    on_cuda = device == 'cuda' or (device is None and ctranslate2.get_cuda_device_count() > 0)
+    return 'int8_float16' if on_cuda else 'int8'
+
+
+@functools.lru_cache(maxsize=2)
+def _faster_whisper_pipeline(name: str, device: str | None):
+    """Batched wrapper over the same loaded weights — no second copy of the model."""
+    from faster_whisper import BatchedInferencePipeline
+
+    return BatchedInferencePipeline(model=_faster_whisper_model(name, device))
 
 
 async def _load_model() -> None:
@@ -21,17 +145,202 @@ async def _load_model() -> None:
     async with _model_lock:
         if _model_loaded:
             return
+        loop = asyncio.get_event_loop()
         if STT_PROVIDER == 'whisper_local':
-            import whisper
-
-            loop = asyncio.get_event_loop()
-            _model = await loop.run_in_executor(None, whisper.load_model, WHISPER_MODEL_SIZE)
+            _model = await loop.run_in_executor(_executor, _whisper_model, WHISPER_MODEL_SIZE, WHISPER_DEVICE)
+        elif STT_PROVIDER == 'faster_whisper':
+            # The VAD model is independent of Whisper's weights, so it loads on its own thread at the same
+            # time instead of on the first clip that needs it
+            _model, _ = await asyncio.gather(
+                loop.run_in_executor(_executor, _faster_whisper_model, WHISPER_MODEL_SIZE, WHISPER_DEVICE),
+                asyncio.to_thread(_load_vad),
+            )
+        if _model is not None:
+            try:
+                await loop.run_in_executor(_executor, _warmup)
+            except Exception:
+                logger.warning('STT warm-up inference failed (non-critical)', exc_info=True)
         _model_loaded = True
 
 
+def _load_vad() -> None:
+    try:
+        from faster_whisper.vad import get_vad_model
+
+        get_vad_model()  # cached inside faster_whisper, so later transcriptions reuse it
+    except Exception:
+        logger.warning('VAD model preload failed (non-critical)', exc_info=True)
+
+
+def _warmup() -> None:
+    """One throwaway inference on a second of silence while model_loaded is still false, so CUDA context
+    setup, kernel selection and allocator growth are not paid by the first player's clip."""
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    if STT_PROVIDER == 'faster_whisper':
+        segments, _ = _model.transcribe(silence, beam_size=WHISPER_BEAM_SIZE, language=WHISPER_LANGUAGE or 'en')
+        for _ in segments:  # lazy — decoding only happens as the generator is drained
+            pass
+    else:
+        _decode_batch([silence])
+
+
+# Canonical 44-byte RIFF header of 16 kHz mono 16-bit PCM, as the browser recorder uploads
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+
+def _read_pcm_wav(audio_data: bytes) -> np.ndarray | None:
+    """Samples of a canonical 16 kHz mono 16-bit WAV, or None if the clip needs a real decoder."""
+    if len(audio_data) < _WAV_HEADER.size:
+        return None
+    riff, _, wave, fmt, fmt_size, codec, channels, rate, _, _, bits, data, _ = _WAV_HEADER.unpack_from(audio_data)
+    if (riff, wave, fmt, data) != (b'RIFF', b'WAVE', b'fmt ', b'data') or fmt_size != 16:
+        return None
+    if (codec, channels, rate, bits) != (1, 1, SAMPLE_RATE, 16):
+        return None
+    count = (len(audio_data) - _WAV_HEADER.size) // 2
+    samples = np.frombuffer(audio_data, dtype='<i2', offset=_WAV_HEADER.size, count=count)
+    return samples.astype(np.float32) / 32768.0
+
+
+async def _decode_audio(audio_data: bytes) -> np.ndarray:
+    """Decode any ffmpeg-readable container to 16 kHz mono float32 PCM, entirely through pipes."""
+    # Already Whisper's input format: convert the samples in place of an ffmpeg process
+    pcm = _read_pcm_wav(audio_data)
+    if pcm is not None:
+        return pcm
+
+    proc = await asyncio.create_subprocess_exec(
+        'ffmpeg',
+        '-nostdin',
+        '-i',
+        'pipe:0',
+        '-f',
+        'f32le',
+        '-ac',
+        '1',
+        '-ar',
+        str(SAMPLE_RATE),
+        'pipe:1',
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    pcm, _ = await proc.communicate(audio_data)
+    if proc.returncode != 0:
+        raise HTTPException(status_code=400, detail='Could not decode audio')
+    # View ffmpeg's output buffer directly as samples — no concatenation or copy
+    return np.frombuffer(pcm, dtype=np.float32)
+
+
+def _batch_mels(clips: list[np.ndarray]):
+    import torch
+    import whisper
+
+    if _model.device.type == 'cuda':
+        return _gpu_batch_mels(clips)
+
+    # Fill one preallocated (STT_MAX_BATCH, n_mels, frames) buffer in place rather than building a
+    # tensor per clip and stacking them into a fresh batch. Safe to reuse: the single inference
+    # thread only starts the next batch after decode() has finished with this one.
+    global _mel_buffer
+    n_mels = _model.dims.n_mels
+    if _mel_buffer is None:
+        _mel_buffer = torch.empty((STT_MAX_BATCH, n_mels, whisper.audio.N_FRAMES))
+    for i, clip in enumerate(clips):
+        _mel_buffer[i].copy_(whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), n_mels))
+    return _mel_buffer[: len(clips)]
+
+
+@functools.lru_cache(maxsize=2)
+def _hann_window(device):
+    """STFT window built once per device and kept resident there, like whisper's cached mel filters."""
+    import torch
+    from whisper.audio import N_FFT
+
+    return torch.hann_window(N_FFT, device=device)
+
+
+def _gpu_batch_mels(clips: list[np.ndarray]):
+    """Whisper's log-mel front end for the whole batch at once on the GPU: one STFT, one mel matmul."""
+    import torch
+    from whisper.audio import HOP_LENGTH, N_FFT, N_SAMPLES, mel_filters
+
+    # Raw samples are padded into a pinned host buffer so the upload runs asynchronously
+    global _audio_buffer
+    if _audio_buffer is None:
+        _audio_buffer = torch.empty((STT_MAX_BATCH, N_SAMPLES), pin_memory=True)
+    host = _audio_buffer.numpy()
+    for i, clip in enumerate(clips):
+        n = min(len(clip), N_SAMPLES)
+        host[i, :n] = clip[:n]
+        host[i, n:] = 0.0
+    audio = _audio_buffer[: len(clips)].to(_model.device, non_blocking=True)
+
+    stft = torch.stft(audio, N_FFT, HOP_LENGTH, window=_hann_window(audio.device), return_complex=True)
+    magnitudes = stft[..., :-1].abs() ** 2
+    log_spec = (mel_filters(audio.device, _model.dims.n_mels) @ magnitudes).clamp(min=1e-10).log10()
+    # Whisper floors the dynamic range per clip, so the max is taken per batch item, not over the batch
+    log_spec = torch.maximum(log_spec, log_spec.amax(dim=(1, 2), keepdim=True) - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+
+def _decode_batch(clips: list[np.ndarray]) -> list[str]:
+    """Single-window clips share one padded mel batch and one Whisper.decode pass."""
+    import torch
+    import whisper
+
+    options = whisper.DecodingOptions(
+        fp16=_model.device.type == 'cuda',
+        without_timestamps=True,
+        language=WHISPER_LANGUAGE,
+        beam_size=WHISPER_BEAM_SIZE if WHISPER_BEAM_SIZE > 1 else None,
+    )
+    # inference_mode also covers the mel front end and skips autograd's version-counter bookkeeping
+    with torch.inference_mode():
+        mels = _batch_mels(clips)
+        return [r.text.strip() for r in whisper.decode(_model, mels, options)]
+
+
+async def _batch_worker() -> None:
+    # Whatever queued up while the previous batch was decoding goes out as the next batch,
+    # so batching adds no latency when requests arrive one at a time.
+    loop = asyncio.get_event_loop()
+    while True:
+        await _pending_ready.wait()
+        batch = [_pending.popleft() for _ in range(min(STT_MAX_BATCH, len(_pending)))]
+        if not _pending:
+            _pending_ready.clear()
+        try:
+            texts = await loop.run_in_executor(_executor, _decode_batch, [clip for clip, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result(text)
+
+
 @app.on_event('startup')
 async def startup() -> None:
+    global _batch_task
     asyncio.create_task(_load_model())
+    if STT_PROVIDER == 'whisper_local':
+        _batch_task = asyncio.create_task(_batch_worker())
+
+
+@app.on_event('shutdown')
+async def shutdown() -> None:
+    # Stop taking new batches and fail what is still queued, but let the decode already running on the
+    # inference thread finish instead of abandoning it with the CUDA context mid-call
+    if _batch_task is not None:
+        _batch_task.cancel()
+    while _pending:
+        _, future = _pending.popleft()
+        if not future.done():
+            future.set_exception(RuntimeError('stt-service is shutting down'))
+    await asyncio.to_thread(_executor.shutdown, wait=True, cancel_futures=True)
 
 
 class TranscribeRequest(BaseModel):
@@ -45,60 +354,78 @@ class TranscribeResponse(BaseModel):
 
 @app.post('/transcribe', response_model=TranscribeResponse)
 async def transcribe(req: TranscribeRequest) -> TranscribeResponse:
-    audio_data = base64.b64decode(req.audio_bytes)
+    return await _transcribe(base64.b64decode(req.audio_bytes), req.format)
+
+
+@app.post('/transcribe/raw', response_model=TranscribeResponse)
+async def transcribe_raw(request: Request, format: str = 'wav') -> TranscribeResponse:
+    """Audio file bytes as the request body — no base64 inflation or JSON wrapping on either side."""
+    return await _transcribe(await request.body(), format)
+
+
+async def _transcribe(audio_data: bytes, fmt: str) -> TranscribeResponse:
     provider = STT_PROVIDER
 
     if provider == 'openai':
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
-        suffix = f'.{req.format}'
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-            f.write(audio_data)
-            tmp_path = f.name
-        try:
-            with open(tmp_path, 'rb') as audio_file:
-                transcript = await client.audio.transcriptions.create(model='whisper-1', file=audio_file)
-            return TranscribeResponse(text=transcript.text)
-        finally:
-            os.unlink(tmp_path)
+        # The upload goes straight from memory; the file name only tells the API the container format
+        transcript = await get_openai_client().audio.transcriptions.create(
+            model='whisper-1', file=(f'audio.{fmt}', audio_data)
+        )
+        return TranscribeResponse(text=transcript.text)
 
-    # whisper_local
     if not _model_loaded:
         await _load_model()
 
-    suffix = f'.{req.format}'
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-        f.write(audio_data)
-        tmp_path = f.name
-
-    # Convert webm to wav using ffmpeg if needed
-    wav_path = tmp_path
-    if req.format == 'webm':
-        wav_path = tmp_path.replace('.webm', '_converted.wav')
-        proc = await asyncio.create_subprocess_exec(
-            'ffmpeg',
-            '-y',
-            '-i',
-            tmp_path,
-            '-ar',
-            '16000',
-            '-ac',
-            '1',
-            wav_path,
-            stdout=asyncio.subprocess.DEVNULL,
-            stderr=asyncio.subprocess.DEVNULL,
-        )
-        await proc.wait()
+    audio = await _decode_audio(audio_data)
 
-    try:
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, lambda: _model.transcribe(wav_path))
-        return TranscribeResponse(text=result['text'].strip())
-    finally:
-        os.unlink(tmp_path)
-        if wav_path != tmp_path and os.path.exists(wav_path):
-            os.unlink(wav_path)
+    if provider == 'faster_whisper':
+        # transcribe() returns a lazy generator — segments are decoded as it's consumed, so drain it
+        # on the inference thread rather than on the event loop
+        def _run() -> str:
+            if len(audio) > WINDOW_SAMPLES:
+                # Longer clips are cut at speech pauses and the chunks share batched encoder/decoder passes
+                # instead of being decoded one window after another
+                pipeline = _faster_whisper_pipeline(WHISPER_MODEL_SIZE, WHISPER_DEVICE)
+                segments, _ = pipeline.transcribe(
+                    audio, batch_size=STT_MAX_BATCH, beam_size=WHISPER_BEAM_SIZE, language=WHISPER_LANGUAGE
+                )
+            else:
+                segments, _ = _model.transcribe(
+                    audio,
+                    beam_size=WHISPER_BEAM_SIZE,
+                    language=WHISPER_LANGUAGE,
+                    vad_filter=WHISPER_VAD,
+                    vad_parameters={'min_silence_duration_ms': WHISPER_VAD_MIN_SILENCE_MS},
+                )
+            return ''.join(segment.text for segment in segments).strip()
+
+        return TranscribeResponse(text=await asyncio.get_event_loop().run_in_executor(_executor, _run))
+
+    # whisper_local
+    if len(audio) <= WINDOW_SAMPLES:
+        future: asyncio.Future[str] = asyncio.get_event_loop().create_future()
+        _pending.append((audio, future))
+        _pending_ready.set()
+        return TranscribeResponse(text=await future)
+
+    # Longer recordings need transcribe()'s sliding window over 30 s segments
+    def _run_long() -> str:
+        import torch
+
+        fp16 = _model.device.type == 'cuda'  # half precision only pays off (and only works) on GPU
+        beam_size = WHISPER_BEAM_SIZE if WHISPER_BEAM_SIZE > 1 else None
+        with torch.inference_mode():
+            clip = audio
+            if fp16:
+                # Upload the samples once, asynchronously from pinned memory; transcribe() then builds the
+                # whole clip's mel on the GPU instead of copying each 30 s window's features from pageable memory
+                pinned = torch.empty(len(audio), pin_memory=True)
+                pinned.numpy()[:] = audio
+                clip = pinned.to(_model.device, non_blocking=True)
+            result = _model.transcribe(clip, fp16=fp16, language=WHISPER_LANGUAGE, beam_size=beam_size)
+        return result['text'].strip()
+
+    return TranscribeResponse(text=await asyncio.get_event_loop().run_in_executor(_executor, _run_long))
 
 
 @app.get('/health')
@@ -1,21 +1,38 @@
+import asyncio
 import base64
 import hashlib
-import io
+import logging
 import os
-import wave
+import re
+import struct
+from collections import OrderedDict
 from typing import Optional
 
 import redis.asyncio as aioredis
 from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title='tts-service')
 
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/1')
 CACHE_TTL = 86400  # 24 hours for audio
+# Whole lines are cached by their full text, which misses the stock phrases the DM and NPCs reuse inside
+# otherwise new lines ("Welcome, traveller."). Gemini speech is synthesised per sentence, so recent
+# sentences are kept in-process and a repeated one skips its provider call
+SENTENCE_CACHE_SIZE = int(os.environ.get('TTS_SENTENCE_CACHE_SIZE', '128'))
+# Sentences fan out concurrently, so a long narration would otherwise fire one provider call per sentence
+# at once and run into Gemini's rate limit
+GEMINI_TTS_CONCURRENCY = int(os.environ.get('GEMINI_TTS_CONCURRENCY', '3'))
 
 _redis: aioredis.Redis | None = None
+_openai_client = None
+_gemini_client = None
+_sentence_pcm: OrderedDict[str, bytes] = OrderedDict()
+_inflight_sentences: dict[str, asyncio.Future[bytes]] = {}
+_gemini_semaphore = asyncio.Semaphore(GEMINI_TTS_CONCURRENCY)
 
 # Map OpenAI voice IDs to Gemini prebuilt voices
 _GEMINI_VOICE_MAP = {
@@ -36,14 +53,58 @@ def get_redis() -> aioredis.Redis:
     return _redis
 
 
-def _pcm_to_wav(pcm_data: bytes, sample_rate: int = 24000, channels: int = 1, sample_width: int = 2) -> bytes:
-    buf = io.BytesIO()
-    with wave.open(buf, 'wb') as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(sample_width)
-        wf.setframerate(sample_rate)
-        wf.writeframes(pcm_data)
-    return buf.getvalue()
+def get_openai_client():
+    # One client per process so its HTTP connection pool (and TLS sessions) are reused
+    global _openai_client
+    if _openai_client is None:
+        from openai import AsyncOpenAI
+
+        _openai_client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
+    return _openai_client
+
+
+def get_gemini_client():
+    global _gemini_client
+    if _gemini_client is None:
+        from google import genai
+
+        _gemini_client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
+    return _gemini_client
+
+
+def _wav_header(data_len: int, sample_rate: int = 24000, channels: int = 1, sample_width: int = 2) -> bytes:
+    # 44-byte canonical RIFF header — no intermediate BytesIO/wave writer
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF',
+        36 + data_len,
+        b'WAVE',
+        b'fmt ',
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        sample_width * 8,
+        b'data',
+        data_len,
+    )
+
+
+def _pcm_to_wav(pcm_data: bytes) -> bytes:
+    return _wav_header(len(pcm_data)) + pcm_data
+
+
+# A streamed WAV doesn't know its length up front; the maximum size is the usual placeholder
+_STREAM_DATA_LEN = 0xFFFFFFFF - 36
+# Gemini TTS is requested per sentence, so the first one can play while the rest are still rendering
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def _split_sentences(text: str) -> list[str]:
+    return [part for part in _SENTENCE_END.split(text.strip()) if part] or [text]
 
 
 class SpeakRequest(BaseModel):
@@ -51,6 +112,7 @@ class SpeakRequest(BaseModel):
     voice_id: str
     voice_instructions: str
     user_id: Optional[str] = None
+    cache: Optional[bool] = True
 
 
 class SpeakResponse(BaseModel):
@@ -60,10 +122,14 @@ class SpeakResponse(BaseModel):
     cached: bool
 
 
-async def _openai_tts(text: str, voice_id: str, instructions: str) -> bytes:
-    from openai import AsyncOpenAI
+def _cache_key(req: SpeakRequest) -> str:
+    # BLAKE2b is faster than SHA-256 on 64-bit CPUs; NUL separators keep fields unambiguous
+    raw = '\0'.join((req.text, req.voice_id, req.voice_instructions))
+    return 'tts:' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
 
-    client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
+
+async def _openai_tts(text: str, voice_id: str, instructions: str) -> bytes:
+    client = get_openai_client()
     model = os.environ.get('OPENAI_TTS_MODEL', 'gpt-4o-mini-tts')
     response = await client.audio.speech.create(
         model=model,
@@ -75,11 +141,9 @@ async def _openai_tts(text: str, voice_id: str, instructions: str) -> bytes:
     return response.content
 
 
-async def _openai_tts_stream(text: str, voice_id: str, instructions: str, redis_key: str):
-    """Yield WAV chunks from OpenAI streaming API and cache the full result when done."""
-    from openai import AsyncOpenAI
-
-    client = AsyncOpenAI(api_key=os.environ['OPENAI_API_KEY'])
+async def _openai_tts_stream(text: str, voice_id: str, instructions: str, redis_key: str | None):
+    """Yield WAV chunks from OpenAI streaming API and cache the full result when done (if redis_key is set)."""
+    client = get_openai_client()
     model = os.environ.get('OPENAI_TTS_MODEL', 'gpt-4o-mini-tts')
     chunks: list[bytes] = []
     async with client.audio.speech.with_streaming_response.create(
@@ -89,17 +153,50 @@ async def _openai_tts_stream(text: str, voice_id: str, instructions: str, redis_
         instructions=instructions,
         response_format='wav',
     ) as response:
-        async for chunk in response.iter_bytes(chunk_size=4096):
-            chunks.append(chunk)
+        # Forward bytes as they arrive rather than re-buffering into fixed-size chunks,
+        # so playback can start on the first network read
+        async for chunk in response.iter_bytes():
+            if redis_key:
+                chunks.append(chunk)
             yield chunk
-    await get_redis().setex(redis_key, CACHE_TTL, b''.join(chunks))
-
-
-async def _gemini_tts(text: str, voice_id: str, instructions: str) -> bytes:
-    from google import genai
+    if redis_key:
+        await get_redis().setex(redis_key, CACHE_TTL, b''.join(chunks))
+
+
+async def _gemini_pcm(text: str, voice_id: str, instructions: str) -> bytes:
+    key = '\0'.join((text, voice_id, instructions))
+    pcm = _sentence_pcm.get(key)
+    if pcm is not None:
+        _sentence_pcm.move_to_end(key)
+        return pcm
+    if key in _inflight_sentences:
+        return await asyncio.shield(_inflight_sentences[key])
+
+    future: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+    _inflight_sentences[key] = future
+    try:
+        async with _gemini_semaphore:
+            pcm = await _gemini_generate_pcm(text, voice_id, instructions)
+        future.set_result(pcm)
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved — there may be no other waiter to observe it
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        _inflight_sentences.pop(key, None)
+
+    _sentence_pcm[key] = pcm
+    while len(_sentence_pcm) > SENTENCE_CACHE_SIZE:
+        _sentence_pcm.popitem(last=False)
+    return pcm
+
+
+async def _gemini_generate_pcm(text: str, voice_id: str, instructions: str) -> bytes:
     from google.genai import types
 
-    client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
+    client = get_gemini_client()
     gemini_voice = _GEMINI_VOICE_MAP.get(voice_id, 'Kore')
     prompt = f'{instructions}\n\n{text}' if instructions else text
     response = await client.aio.models.generate_content(
@@ -112,16 +209,38 @@ async def _gemini_tts(text: str, voice_id: str, instructions: str) -> bytes:
             ),
         ),
     )
-    pcm = response.candidates[0].content.parts[0].inline_data.data
-    return _pcm_to_wav(pcm)
+    return response.candidates[0].content.parts[0].inline_data.data
+
+
+async def _gemini_tts(text: str, voice_id: str, instructions: str) -> bytes:
+    # Sentences are synthesised concurrently, so the whole clip takes about as long as its longest sentence
+    sentences = _split_sentences(text)
+    pcm_parts = await asyncio.gather(*(_gemini_pcm(s, voice_id, instructions) for s in sentences))
+    return _pcm_to_wav(b''.join(pcm_parts))
+
+
+async def _gemini_tts_stream(text: str, voice_id: str, instructions: str, redis_key: str | None):
+    """Gemini has no streaming API: every sentence is requested at once and each is sent as soon as it and all
+    earlier sentences are ready, so playback starts after the first sentence instead of the whole text."""
+    tasks = [asyncio.ensure_future(_gemini_pcm(s, voice_id, instructions)) for s in _split_sentences(text)]
+    pcm_parts: list[bytes] = []
+    try:
+        yield _wav_header(_STREAM_DATA_LEN)
+        for task in tasks:
+            pcm_parts.append(await task)
+            yield pcm_parts[-1]
+    finally:
+        for task in tasks:
+            task.cancel()
+    if redis_key:
+        await get_redis().setex(redis_key, CACHE_TTL, _pcm_to_wav(b''.join(pcm_parts)))
 
 
 @app.post('/speak', response_model=SpeakResponse)
 async def speak(req: SpeakRequest) -> SpeakResponse:
-    cache_key = hashlib.sha256(f'{req.text}:{req.voice_id}:{req.voice_instructions}'.encode()).hexdigest()
-    redis_key = f'tts:{cache_key}'
+    redis_key = _cache_key(req) if req.cache else None
 
-    cached = await get_redis().get(redis_key)
+    cached = await get_redis().get(redis_key) if redis_key else None
     if cached:
         duration = len(cached) / (24000 * 2)
         return SpeakResponse(
@@ -138,7 +257,8 @@ async def speak(req: SpeakRequest) -> SpeakResponse:
     else:
         raise NotImplementedError(f'TTS provider {provider!r} not implemented')
 
-    await get_redis().setex(redis_key, CACHE_TTL, audio_bytes)
+    if redis_key:
+        await get_redis().setex(redis_key, CACHE_TTL, audio_bytes)
     duration = len(audio_bytes) / (24000 * 2)
     return SpeakResponse(
         audio_bytes=base64.b64encode(audio_bytes).decode(),
@@ -148,35 +268,41 @@ async def speak(req: SpeakRequest) -> SpeakResponse:
 
 
 @app.post('/speak/stream')
-async def speak_stream(req: SpeakRequest) -> StreamingResponse:
-    cache_key = hashlib.sha256(f'{req.text}:{req.voice_id}:{req.voice_instructions}'.encode()).hexdigest()
-    redis_key = f'tts:{cache_key}'
-
-    cached = await get_redis().get(redis_key)
+async def speak_stream(req: SpeakRequest) -> Response:
+    # Callers with their own durable store (media-mcp keeps every line on disk) pass cache=false
+    # so the audio isn't held a second time in Redis memory
+    redis_key = _cache_key(req) if req.cache else None
+
+    # Audio that is already complete goes out as one body rather than a stream of 4 KB sends,
+    # each of which cost an event-loop round-trip and a chunked-encoding frame
+    cached = await get_redis().get(redis_key) if redis_key else None
     if cached:
-        async def _from_cache():
-            offset = 0
-            while offset < len(cached):
-                yield cached[offset : offset + 4096]
-                offset += 4096
-
-        return StreamingResponse(_from_cache(), media_type='audio/wav')
+        return Response(content=cached, media_type='audio/wav')
 
     provider = os.environ.get('TTS_PROVIDER', 'openai')
     if provider == 'openai':
         return StreamingResponse(_openai_tts_stream(req.text, req.voice_id, req.voice_instructions, redis_key), media_type='audio/wav')
 
-    # Gemini: no streaming API — generate fully then stream bytes
-    audio_bytes = await _gemini_tts(req.text, req.voice_id, req.voice_instructions)
-    await get_redis().setex(redis_key, CACHE_TTL, audio_bytes)
+    return StreamingResponse(
+        _gemini_tts_stream(req.text, req.voice_id, req.voice_instructions, redis_key), media_type='audio/wav'
+    )
 
-    async def _from_bytes():
-        offset = 0
-        while offset < len(audio_bytes):
-            yield audio_bytes[offset : offset + 4096]
-            offset += 4096
 
-    return StreamingResponse(_from_bytes(), media_type='audio/wav')
+@app.on_event('startup')
+async def startup() -> None:
+    # Paid here, side by side, rather than one after the other by the first line spoken: importing the
+    # provider SDK and building its client (seconds for google-genai) on a worker thread, and the first
+    # Redis connection
+    provider = os.environ.get('TTS_PROVIDER', 'openai')
+    get_client = {'openai': get_openai_client, 'gemini': get_gemini_client}.get(provider)
+    results = await asyncio.gather(
+        asyncio.to_thread(get_client) if get_client else asyncio.sleep(0),
+        get_redis().ping(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning('Warm-up failed (non-critical)', exc_info=result)
 
 
 @app.get('/health')